@@ -0,0 +1,124 @@
+import csv
+import multiprocessing
+
+import numpy
+
+from trial_store import TrialStore, poor_timing
+
+SAME_KEY, DIFFERENT_KEY = 70, 74  # F and J, any other key is no answer
+
+# tidy results, one row per session and set size
+COLUMNS = [
+    'session', 'set_size', 'trials', 'answered', 'poor_timing',
+    'hit_rate', 'false_alarm_rate', 'k',
+    'rt_median', 'rt_mean', 'rt_sd', 'rt_p10', 'rt_p90',
+    'session_trials', 'session_accuracy', 'excluded', 'exclusion_reasons',
+]
+
+# a session is excluded when any of these is exceeded
+MIN_TRIALS = 20
+MAX_UNANSWERED = 0.2  # share of trials without a response
+MAX_POOR_TIMING = 0.2  # share of trials flagged by `poor_timing`
+MIN_ACCURACY = 0.55  # share of correct answers, chance is 0.5
+
+
+def rate(hits, trials):
+    return hits.sum() / trials.sum() if trials.any() else numpy.nan
+
+
+def exclusion_reasons(records, answered, timing):
+    """
+    :return: why a session's data can't be used, empty if it can
+    """
+    reasons = []
+    if len(records) < MIN_TRIALS:
+        reasons.append('too few trials')
+        if not len(records):
+            return reasons
+    if 1 - answered.mean() > MAX_UNANSWERED:
+        reasons.append('unanswered')
+    if timing.mean() > MAX_POOR_TIMING:
+        reasons.append('poor timing')
+    if answered.any() and records['correct'][answered].mean() < MIN_ACCURACY:
+        reasons.append('chance accuracy')
+    return reasons
+
+
+def analyze_session(task):
+    """
+    Summarize one session. Runs in a pool worker, which is handed the
+    store's directory and the session id only, and maps the session's file
+    itself rather than receiving its records.
+
+    :param task: (trial store directory, session id)
+    :return: rows as in `COLUMNS`
+    """
+    directory, session = task
+    records = TrialStore(directory).read(session)
+    answered = numpy.isin(records['key'], [SAME_KEY, DIFFERENT_KEY])
+    timing = poor_timing(records)
+    reasons = exclusion_reasons(records, answered, timing)
+    # capacity and response times only from trials with a response and reliable timing
+    usable = answered & ~timing
+    changed = records['changed'] != 0
+    said_different = records['key'] == DIFFERENT_KEY
+
+    rows = []
+    for set_size in numpy.unique(records['set_size']):
+        trials = records['set_size'] == set_size
+        selected = trials & usable
+        hit_rate = rate(said_different & selected & changed, selected & changed)
+        false_alarm_rate = rate(said_different & selected & ~changed, selected & ~changed)
+        rt = records['rt'][selected]
+        rows.append({
+            'session': session,
+            'set_size': int(set_size),
+            'trials': int(trials.sum()),
+            'answered': int((trials & answered).sum()),
+            'poor_timing': int((trials & timing).sum()),
+            'hit_rate': hit_rate,
+            'false_alarm_rate': false_alarm_rate,
+            'k': set_size * (hit_rate - false_alarm_rate),  # Cowan's K for single-probe change detection
+            'rt_median': numpy.median(rt) if len(rt) else numpy.nan,
+            'rt_mean': rt.mean() if len(rt) else numpy.nan,
+            'rt_sd': rt.std(ddof=1) if len(rt) > 1 else numpy.nan,
+            'rt_p10': numpy.percentile(rt, 10) if len(rt) else numpy.nan,
+            'rt_p90': numpy.percentile(rt, 90) if len(rt) else numpy.nan,
+            'session_trials': len(records),
+            'session_accuracy': records['correct'][answered].mean() if answered.any() else numpy.nan,
+            'excluded': int(bool(reasons)),
+            'exclusion_reasons': ';'.join(reasons),
+        })
+    return rows
+
+
+def analyze(directory, sessions=None, processes=None, chunksize=8):
+    """
+    Summarize sessions in parallel, sharded over a pool of processes.
+
+    :param directory: directory of the `TrialStore`
+    :param sessions: ids of the sessions to analyze, all by default
+    :param processes: pool size, the number of CPUs by default
+    :return: generator of rows as in `COLUMNS`, in session order
+    """
+    if sessions is None:
+        sessions = TrialStore(directory).sessions()
+    with multiprocessing.Pool(processes) as pool:
+        for rows in pool.imap(analyze_session, [(directory, session) for session in sessions], chunksize):
+            yield from rows
+
+
+def write_results(rows, path):
+    """
+    Write rows as CSV.
+
+    :return: number of rows written
+    """
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
@@ -1,9 +1,22 @@
+import os
+import subprocess
+import click
 from flask import Flask 
 from flask import render_template, request, jsonify, Response
 from flask_cache_buster import CacheBuster
+from trial_store import TrialStore, BATCH_MIMETYPE, check_integer, decode_batch, trials_to_records
+from session_store import SessionStore
+from staircase import Staircase
+from profiling import RequestProfiler
+from analysis import analyze, write_results
 config = {
      'extensions': ['.js', '.css', '.csv'],
-     'hash_size': 10
+     'hash_size': 10,
+     #written by `flask build-assets`, lets the app start without hashing the static folder
+     'manifest': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bust_manifest.json'),
+     #precaches the page and the compiled experiment, so repeat visits and flaky connections don't need the network
+     'service_worker': '/sw.js',
+     'precache': ['__target__/', 'palette.csv']
 }
 #configure an extension used to bust caches
 cache_buster = CacheBuster(config=config)
@@ -20,6 +33,57 @@ app = Flask(__name__, template_folder='./templates', static_folder='./static')
 #if resources have been updated, use the most recent resources instead of old cached resources
 cache_buster.register_cache_buster(app)
 
+#profile requests that carry a token from `flask profile-token`, and a sampled fraction of all requests
+#without PROFILE_SECRET and PROFILE_SAMPLE_RATE the app runs unprofiled
+profiler = RequestProfiler(config={
+    'directory': os.environ.get("PROFILE_DIR", os.path.join(app.root_path, "profiles")),
+    'secret': os.environ.get("PROFILE_SECRET"),
+    'sample_rate': float(os.environ.get("PROFILE_SAMPLE_RATE", 0)),
+    'max_files': 200
+})
+profiler.register_profiler(app)
+
+#trial data is kept as one file of fixed-width records per session, see trial_store.py
+trial_store = TrialStore(os.environ.get("TRIAL_STORE", os.path.join(app.root_path, "data")))
+
+#progress of recently active sessions, kept in memory so a refreshed page can resume quickly
+session_store = SessionStore(trial_store)
+
+#chooses each session's next set size from its responses so far, see staircase.py
+staircase = Staircase(trial_store)
+
+#compile the transcrypt sources that changed since the last build, then refresh the cache busting tables
+#run this instead of calling `transcrypt -b static/<game>.py` by hand
+@app.cli.command("build-assets")
+@click.option("--force", is_flag=True, help="Recompile even if a source did not change.")
+def build_assets_command(force):
+    #imported here, so serving requests doesn't load the compiler driver and the headless harness
+    from assets import build_assets
+    try:
+        compiled = build_assets(app, cache_buster, force=force)
+    except subprocess.CalledProcessError as e:
+        raise click.ClickException(f"transcrypt failed with exit code {e.returncode}")
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"compiled: {', '.join(compiled) or 'nothing'}")
+
+#summarize every session in the trial store, one row per session and set size, see analysis.py
+@app.cli.command("analyze")
+@click.option("--output", default="results.csv", show_default=True, help="CSV file to write.")
+@click.option("--processes", type=int, help="Worker processes, the number of CPUs by default.")
+def analyze_command(output, processes):
+    count = write_results(analyze(trial_store.directory, processes=processes), output)
+    click.echo(f"wrote {count} rows to {output}")
+
+#print a token that turns profiling on for requests sending it as the X-Profile header, e.g.
+#curl -H "X-Profile: $(flask profile-token)" ... then fetch the results from /_profiles/?token=...
+@app.cli.command("profile-token")
+def profile_token_command():
+    try:
+        click.echo(profiler.token())
+    except ValueError:
+        raise click.ClickException("set PROFILE_SECRET to profile requests on demand")
+
 #set a route for the load screen
 @app.route("/")
 def home():
@@ -28,6 +92,57 @@ def home():
     #app = Flask(... , template_folder=<your new folder>, ...)
     return render_template("home.html")
 
+#the experiment posts finished trials here in batches, packed as described in trial_store.py,
+#or as {"session": ..., "trials": [...]} if it can't
+@app.route("/trials", methods=["POST"])
+def store_trials():
+    try:
+        if request.mimetype == BATCH_MIMETYPE:
+            session, pending, records = decode_batch(request.get_data())
+        else:
+            batch = request.get_json(silent=True)
+            if not isinstance(batch, dict) or not isinstance(batch.get("trials"), list):
+                return jsonify({"error": "expected a JSON object with a list of trials"}), 400
+            #same range as the binary header's field
+            pending = check_integer("pending", batch.get("pending", 0), "<u2")
+            session, records = batch.get("session"), trials_to_records(batch["trials"])
+        stored = trial_store.append_records(session, records)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if stored:
+        #progress comes from the records as stored, the client's values may be e.g. numeric strings
+        last = records[-1]
+        session_store.record(session, int(last["block"]), int(last["trial"]) + 1, int(last["seed"]), pending)
+    return jsonify({"stored": stored})
+
+#where a session left off, so the experiment can pick up after a page refresh
+@app.route("/sessions/<session>/resume")
+def resume_session(session):
+    try:
+        progress = session_store.progress(session)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if progress is None:
+        return jsonify({"error": "unknown session"}), 404
+    return jsonify(progress.as_dict())
+
+#the experiment reports every response here and gets the set size of its next trial back
+#a GET gives the choice for the responses seen so far, e.g. for the first trial
+@app.route("/sessions/<session>/staircase", methods=["GET", "POST"])
+def staircase_step(session):
+    try:
+        state = staircase.state(session)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if request.method == "POST":
+        response = request.get_json(silent=True)
+        try:
+            state = staircase.update(session, response["trial"], response["setSize"], response["correct"])
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({"error": f"malformed response: {e}"}), 400
+    return jsonify(staircase.summary(state))
+
+#development server only, in production run `gunicorn app:app` (settings in gunicorn.conf.py)
 if __name__ == "__main__":
     from os import environ
     app.run(debug=False, port=environ.get("PORT", 33507), processes=2)
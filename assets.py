@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import hashlib
+import subprocess
+
+from palette import PALETTE, write_palette
+from headless import roundtrip
+
+# Transcrypt sources in the static folder, compiled into static/__target__
+SOURCES = ('ktask.py', 'pong.py')
+
+# -b rebuilds every module the source imports; the output is minified
+# because -n (--nomin) is not given, which needs java for the closure compiler
+TRANSCRYPT = [sys.executable, '-m', 'transcrypt', '-b']
+
+FINGERPRINTS = os.path.join('__target__', 'fingerprints.json')
+
+
+def fingerprint(path):
+    """
+    :param path: source file
+    :return: hash of the file's content and of the compiler command line
+    """
+    digest = hashlib.sha256(' '.join(TRANSCRYPT[1:]).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def compile_source(app, path):
+    """
+    Compile one Transcrypt source into the static folder's __target__.
+
+    Transcrypt empties __target__ before a build, and before any compile
+    of a source without a project file there, so the files it removed that
+    belong to the other sources are put back afterwards, whether or not
+    the compile succeeded.
+
+    :param app: Flask application whose static folder holds the source
+    :param path: path of the source
+    """
+    target_dir = os.path.join(app.static_folder, '__target__')
+    kept = {}
+    if os.path.isdir(target_dir):
+        for filename in os.listdir(target_dir):
+            with open(os.path.join(target_dir, filename), 'rb') as f:
+                kept[filename] = f.read()
+
+    try:
+        subprocess.run(
+            TRANSCRYPT + [os.path.relpath(path, app.root_path)],
+            cwd=app.root_path, check=True
+        )
+    finally:  # also when the compile failed after emptying __target__
+        os.makedirs(target_dir, exist_ok=True)
+        for filename, content in kept.items():
+            if not os.path.exists(os.path.join(target_dir, filename)):
+                with open(os.path.join(target_dir, filename), 'wb') as f:
+                    f.write(content)
+
+
+def build_assets(app, cache_buster, sources=SOURCES, force=False):
+    """
+    Compile the Transcrypt sources whose content changed since the last
+    build and regenerate the colour palette, then refresh the cache
+    buster's tables and manifest.
+
+    :param app: Flask application whose static folder holds the sources
+    :param cache_buster: `CacheBuster` registered on `app`
+    :param sources: source filenames, relative to the static folder
+    :param force: compile even if a source is unchanged
+    :return: list of the sources that were compiled
+    :raise ValueError: if the experiment's binary batches don't match
+        the trial store's record layout, before anything is compiled
+    """
+    roundtrip.check()
+
+    fingerprints_path = os.path.join(app.static_folder, FINGERPRINTS)
+    try:
+        with open(fingerprints_path) as f:
+            fingerprints = json.load(f)
+    except FileNotFoundError:
+        fingerprints = {}
+
+    compiled = []
+    for source in sources:
+        path = os.path.join(app.static_folder, source)
+        target = os.path.join(app.static_folder, '__target__', os.path.splitext(source)[0] + '.js')
+        current = fingerprint(path)
+        if not force and fingerprints.get(source) == current and os.path.exists(target):
+            app.logger.info(f'{source} is unchanged, skipping')
+            continue
+
+        app.logger.info(f'Compiling {source}')
+        compile_source(app, path)
+        fingerprints[source] = current
+        compiled.append(source)
+
+    os.makedirs(os.path.dirname(fingerprints_path), exist_ok=True)
+    with open(fingerprints_path, 'w') as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+
+    # deterministic, so its busted URL only changes with the palette's parameters
+    write_palette(os.path.join(app.static_folder, PALETTE))
+
+    cache_buster.refresh(app, rehash=True)
+    if cache_buster.manifest:
+        cache_buster.write_manifest(app)
+    return compiled
@@ -1,9 +1,69 @@
 import os
+import json
 import hashlib
 from pathlib import Path
 
+from flask import Response, url_for
+
 HASH_SIZE = 10
 
+SERVICE_WORKER = """\
+// Generated by CacheBuster from its bust map, do not edit.
+const CACHE = 'precache-%(version)s';
+const SHELL = %(shell)s;
+// unbusted path -> busted URL of every precached asset
+const ASSETS = new Map(%(assets)s);
+const BUSTED = new Set(ASSETS.values());
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE)
+            .then(cache => cache.addAll([SHELL, ...BUSTED]))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // every build gets its own cache, drop the ones of older builds
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('precache-') && key !== CACHE).map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+    if (BUSTED.has(url.pathname + url.search) || ASSETS.has(url.pathname)) {
+        // the content hash is in the busted URL, so the cached copy never goes stale;
+        // modules imported without a hash get the copy belonging to this build
+        const busted = ASSETS.get(url.pathname) || url.pathname + url.search;
+        event.respondWith(
+            caches.open(CACHE)
+                .then(cache => cache.match(busted))
+                .then(cached => cached || fetch(request))
+        );
+    } else if (request.mode === 'navigate' && url.pathname === SHELL) {
+        // keep the shell fresh while online, serve the cached one when the network fails
+        event.respondWith(
+            fetch(request)
+                .then(response => {
+                    const copy = response.clone();
+                    caches.open(CACHE).then(cache => cache.put(SHELL, copy));
+                    return response;
+                })
+                .catch(() => caches.match(SHELL))
+        );
+    }
+});
+"""
+
 
 class CacheBuster:
     def __init__(self, app=None, config=None):
@@ -14,6 +74,11 @@ class CacheBuster:
         self.config = config
         self.extensions = self.config.get('extensions') if self.config else []
         self.hash_size = self.config.get('hash_size') if self.config else HASH_SIZE
+        self.manifest = self.config.get('manifest') if self.config else None
+        self.service_worker = self.config.get('service_worker') if self.config else None
+        self.precache = self.config.get('precache', ['__target__/']) if self.config else ['__target__/']
+        self.bust_map = {}  # map from an unbusted filename to a busted one
+        self.unbust_map = {}  # map from a busted filename to an unbusted one
         if self.app is not None:
             self.register_cache_buster(app, config)
 
@@ -26,6 +91,130 @@ class CacheBuster:
             return True
         return Path(filepath).suffix in self.extensions if filepath else False
 
+    def refresh(self, app, rehash=False):
+        """
+        Fill the (un)bust tables from the manifest if there is one matching
+        the current configuration, otherwise by hashing the static folder.
+
+        :param app: Flask application whose static folder is busted
+        :param rehash: ignore the manifest and always hash the files
+        """
+        bust_map = None if rehash else self.read_manifest(app)
+        if bust_map is None:
+            bust_map = self.compute_bust_map(app)
+        self.bust_map = bust_map
+        self.unbust_map = {busted: unbusted for unbusted, busted in bust_map.items()}
+        self.service_worker_script = None  # regenerated from the new tables on the next request
+
+    def compute_bust_map(self, app):
+        """
+        :param app: Flask application whose static folder is busted
+        :return: map from an unbusted filename to a busted one
+        """
+        bust_map = {}
+        # http://flask.pocoo.org/docs/0.12/api/#flask.Flask.static_folder
+
+        app.logger.debug('Starting computing hashes for static assets')
+        # compute (un)bust tables.
+        for rooted_filename, unbusted in self.files_to_bust(app):
+            # compute version component
+            app.logger.debug(f'Computing hashes for {rooted_filename}')
+            with open(rooted_filename, 'rb') as f:
+                version = hashlib.md5(
+                    f.read()
+                ).hexdigest()[:self.hash_size]
+
+            # add version
+            # busted = os.path.join(version, unbusted)
+            busted = f"{unbusted}?q={version}"
+
+            # save computation to map
+            bust_map[unbusted] = busted
+        app.logger.debug('Finished Starting computing hashes for static assets')
+        return bust_map
+
+    def files_to_bust(self, app):
+        """
+        :param app: Flask application whose static folder is busted
+        :return: generator of (path, filename relative to the static
+            folder) of every file to be busted
+        """
+        for dirpath, dirnames, filenames in os.walk(app.static_folder):
+            for filename in filenames:
+                rooted_filename = os.path.join(dirpath, filename)
+                if self.__is_file_to_be_busted(rooted_filename):
+                    yield rooted_filename, os.path.relpath(rooted_filename, app.static_folder)
+
+    def stat_files(self, app):
+        """
+        :param app: Flask application whose static folder is busted
+        :return: map from an unbusted filename to the file's size and
+            modification time, cheap to compare against the manifest
+        """
+        files = {}
+        for rooted_filename, unbusted in self.files_to_bust(app):
+            stat = os.stat(rooted_filename)
+            files[unbusted] = [stat.st_size, stat.st_mtime_ns]
+        return files
+
+    def read_manifest(self, app):
+        """
+        :param app: Flask application whose static folder is busted
+        :return: bust map stored in the manifest, None if there is no
+            manifest, it was written with a different configuration or a
+            file was added, removed or changed since
+        """
+        if not self.manifest or not os.path.exists(self.manifest):
+            return None
+        with open(self.manifest) as f:
+            manifest = json.load(f)
+        if manifest.get('hash_size') != self.hash_size or manifest.get('extensions') != self.extensions:
+            return None
+        if manifest.get('files') != self.stat_files(app):
+            app.logger.info('Static files changed since the manifest was written, rehashing')
+            return None
+        return manifest['bust_map']
+
+    def write_manifest(self, app):
+        """
+        Store the current bust map, so that the next start of the app does
+        not have to hash the static folder again as long as its files keep
+        their sizes and modification times.
+
+        :param app: Flask application whose static folder is busted
+        """
+        if not self.manifest:
+            raise ValueError("no `manifest` path in the cache buster's config")
+        with open(self.manifest, 'w') as f:
+            json.dump({
+                'hash_size': self.hash_size,
+                'extensions': self.extensions,
+                'files': self.stat_files(app),
+                'bust_map': self.bust_map,
+            }, f, indent=2, sort_keys=True)
+
+    def generate_service_worker(self, shell='/'):
+        """
+        Generate a service worker that precaches `shell` and every busted
+        asset under the `precache` prefixes. Must be called in a request or
+        app context, as URLs are built with `url_for`.
+
+        :param shell: URL of the page that loads the assets
+        :return: JavaScript source of the service worker
+        """
+        assets = sorted(
+            (url_for('static', filename=unbusted, _bust=False), url_for('static', filename=unbusted))
+            for unbusted in self.bust_map
+            if any(unbusted.startswith(prefix) for prefix in self.precache)
+        )
+        # the cache name changes whenever any precached asset does
+        version = hashlib.md5(json.dumps([shell, assets]).encode()).hexdigest()[:self.hash_size]
+        return SERVICE_WORKER % {
+            'version': version,
+            'shell': json.dumps(shell),
+            'assets': json.dumps(assets),
+        }
+
     def register_cache_buster(self, app, config=None):
         """
         Register `app` in cache buster so that `url_for` adds a unique prefix
@@ -38,39 +227,13 @@ class CacheBuster:
         if not (config is None or isinstance(config, dict)):
             raise ValueError("`config` must be an instance of dict or None")
 
-        bust_map = {}  # map from an unbusted filename to a busted one
-        unbust_map = {}  # map from a busted filename to an unbusted one
-        # http://flask.pocoo.org/docs/0.12/api/#flask.Flask.static_folder
-
-        app.logger.debug('Starting computing hashes for static assets')
-        # compute (un)bust tables.
-        for dirpath, dirnames, filenames in os.walk(app.static_folder):
-            for filename in filenames:
-                # compute version component
-                rooted_filename = os.path.join(dirpath, filename)
-                if not self.__is_file_to_be_busted(rooted_filename):
-                    continue
-                app.logger.debug(f'Computing hashes for {rooted_filename}')
-                with open(rooted_filename, 'rb') as f:
-                    version = hashlib.md5(
-                        f.read()
-                    ).hexdigest()[:self.hash_size]
-
-                # add version
-                unbusted = os.path.relpath(rooted_filename, app.static_folder)
-                # busted = os.path.join(version, unbusted)
-                busted = f"{unbusted}?q={version}"
-
-                # save computation to map
-                bust_map[unbusted] = busted
-                unbust_map[busted] = unbusted
-        app.logger.debug('Finished Starting computing hashes for static assets')
+        self.refresh(app)
 
         def bust_filename(file):
-            return bust_map.get(file, file)
+            return self.bust_map.get(file, file)
 
         def unbust_filename(file):
-            return unbust_map.get(file, file)
+            return self.unbust_map.get(file, file)
 
         @app.url_defaults
         def reverse_to_cache_busted_url(endpoint, values):
@@ -78,7 +241,7 @@ class CacheBuster:
             Make `url_for` produce busted filenames when using the 'static'
             endpoint.
             """
-            if endpoint == 'static':
+            if endpoint == 'static' and values.pop('_bust', True):
                 values['filename'] = bust_filename(values['filename'])
 
         def debusting_static_view(*args, **kwargs):
@@ -92,4 +255,20 @@ class CacheBuster:
         original_static_view = app.view_functions['static']
         app.view_functions['static'] = debusting_static_view
 
+        if self.service_worker:
+            def service_worker_view():
+                """
+                Serve the precaching service worker. It must not be cached
+                itself, so that browsers notice when a new build changed it.
+                """
+                if self.service_worker_script is None:
+                    self.service_worker_script = self.generate_service_worker()
+                response = Response(self.service_worker_script, mimetype='application/javascript')
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+
+            # a service worker only controls pages under its own path, so it
+            # is served from the configured URL rather than the static folder
+            app.add_url_rule(self.service_worker, 'service_worker', service_worker_view)
+
 
@@ -0,0 +1,59 @@
+#production settings for serving app.py with gunicorn. gunicorn reads this file
+#from the working directory by itself, so starting the server is just
+#
+#   gunicorn app:app
+#
+#every setting below can be overridden on the command line or through the
+#environment variables read here
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 33507)}"
+
+#import app.py once, in the master, before forking. the cache buster's hash tables
+#and the compiled templates are then shared copy-on-write with the workers,
+#instead of being rebuilt by each of them
+preload_app = True
+
+#ingesting trial batches mostly waits on the network and the disk, so every worker
+#process runs a pool of threads. one process per core keeps the cores busy.
+#threads are per worker, so with workers sized from the CPU count the total of
+#4 x cores threads already scales with it. how many requests one core can keep
+#waiting on I/O doesn't depend on how many cores there are, hence a constant;
+#deriving it from the CPU count too would grow the total with its square
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+#participants' browsers reuse connections between trial uploads
+keepalive = 5
+
+#file to create once a worker accepts requests, for orchestrators that poll for readiness
+ready_file = os.environ.get("READY_FILE")
+
+
+def when_ready(server):
+    #runs in the master after the app was loaded, before any worker is forked
+    from app import app
+    with app.app_context():
+        app.jinja_env.get_template("home.html")
+
+    #move everything allocated so far out of the collector's reach, so collections
+    #in the workers don't write to (and so copy) the pages shared with the master
+    gc.freeze()
+    server.log.info("Assets hashed, templates compiled, forking workers")
+
+
+def post_worker_init(worker):
+    #runs in each worker right before it starts accepting connections, the
+    #first one to get here makes the server ready
+    if ready_file and not os.path.exists(ready_file):
+        with open(ready_file, "w") as f:
+            f.write(str(worker.ppid))
+        worker.log.info("Ready: worker %s accepts requests", worker.pid)
+
+
+def on_exit(server):
+    if ready_file and os.path.exists(ready_file):
+        os.remove(ready_file)
@@ -0,0 +1,110 @@
+"""
+Run the Transcrypt games in `static/` under CPython, without a browser.
+
+`load` executes a game module against fresh browser and fabric stand-ins
+and returns a `Page` whose virtual clock drives the game's timers and
+animation frames::
+
+    page = load('pong', seed=1)
+    page.press(' ')
+    page.run(60 * 1000)  # a minute of game time
+"""
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
+from headless import fabric
+from headless.browser import Browser, Response, VirtualClock
+
+STATIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+
+KEY_CODES = {' ': 32, 'enter': 13, 'esc': 27}
+
+
+def serve_static(url, options=None):
+    """
+    Answer a fetch the way the app's static route would, 404 for anything
+    else, e.g. the trial uploads.
+    """
+    if (options or {}).get('method', 'GET') == 'GET' and isinstance(url, str) and url.startswith('/static/'):
+        path = os.path.join(STATIC, *url[len('/static/'):].split('?')[0].split('/'))
+        if os.path.isfile(path):
+            with open(path) as f:
+                return Response(200, f.read())
+    return Response()
+
+
+class Page:
+    """
+    A loaded game module together with the browser it runs in.
+    """
+
+    def __init__(self, browser, module):
+        self.browser = browser
+        self.module = module
+        self.window = browser.window
+        self.clock = browser.clock
+
+    @property
+    def game(self):
+        return self.module.game
+
+    def run(self, ms, step=None):
+        """
+        Advance the virtual clock by `ms`, in increments of `step` ms if given.
+        """
+        if step is None:
+            self.clock.advance(ms)
+            return
+        for _ in range(int(ms // step)):
+            self.clock.advance(step)
+
+    def press(self, key):
+        """
+        Key down event for `key`, a character or a name in `KEY_CODES`.
+        """
+        return self.window.dispatch('keydown', keyCode=KEY_CODES.get(key, ord(key.upper()[0])))
+
+    def release(self, key=None):
+        return self.window.dispatch('keyup', keyCode=KEY_CODES.get(key, 0) if key else 0)
+
+
+def load(name, seed=None, refresh_rate=60, search=''):
+    """
+    Execute `static/<name>.py` with browser globals backed by a virtual clock.
+
+    :param name: game module, e.g. 'ktask' or 'pong'
+    :param seed: seed for `Math.random`, for reproducible runs
+    :param refresh_rate: rate of the animation frames, in Hz
+    :param search: query string of the page's URL, e.g. '?batched'
+    :return: `Page`
+    """
+    browser = Browser(seed=seed, refresh_rate=refresh_rate, search=search)
+    # what home.html sets before the game's script runs
+    browser.window.paletteUrl = '/static/palette.csv'
+    browser.window.respond = serve_static
+    stubs = {
+        'org': ModuleType('org'),
+        'org.transcrypt': ModuleType('org.transcrypt'),
+        'org.transcrypt.stubs': ModuleType('org.transcrypt.stubs'),
+        'org.transcrypt.stubs.browser': browser.module(),
+        'com': ModuleType('com'),
+        'com.fabricjs': fabric.module(),
+    }
+    saved = {key: sys.modules.get(key) for key in stubs}
+    sys.modules.update(stubs)
+    try:
+        spec = importlib.util.spec_from_file_location(f'headless.games.{name}', os.path.join(STATIC, f'{name}.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                sys.modules.pop(key, None)
+            else:
+                sys.modules[key] = value
+    return Page(browser, module)
+
+
+__all__ = ['Browser', 'Page', 'VirtualClock', 'load']
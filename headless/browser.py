@@ -0,0 +1,274 @@
+"""
+CPython stand-ins for the names `static/*.py` imports from Transcrypt's
+`org.transcrypt.stubs.browser`, driven by a virtual clock instead of the
+browser's event loop.
+"""
+import heapq
+import json
+import math
+import random
+import struct
+from types import ModuleType, SimpleNamespace
+
+EPOCH = 1.6e12  # `Date` reports wall clock time, the virtual clock starts at this many ms after 1970
+
+
+class VirtualClock:
+    """
+    Milliseconds since page load, advanced explicitly with `advance`.
+
+    Timers and animation frames fire in time order as the clock
+    passes them, animation frames at a fixed refresh rate.
+    """
+
+    def __init__(self, refresh_rate=60):
+        self.now = 0.0
+        self.frame_period = 1000 / refresh_rate
+        self.next_frame = self.frame_period
+        self.frames = []  # callbacks waiting for the next animation frame
+        self.timers = []  # heap of [due, order, callback, period], period None for a timeout
+        self.order = 0
+
+    def set_interval(self, callback, period):
+        self.order += 1
+        # browsers don't run intervals faster than every few ms
+        heapq.heappush(self.timers, [self.now + max(period, 4), self.order, callback, max(period, 4)])
+        return self.order
+
+    def set_timeout(self, callback, delay):
+        self.order += 1
+        heapq.heappush(self.timers, [self.now + max(delay, 4), self.order, callback, None])
+        return self.order
+
+    def request_animation_frame(self, callback):
+        self.frames.append(callback)
+        return len(self.frames)
+
+    def rebind(self, rebind):
+        """
+        Replace every scheduled callback by `rebind(callback)`.
+        """
+        for timer in self.timers:
+            timer[2] = rebind(timer[2])
+        self.frames = [rebind(callback) for callback in self.frames]
+
+    def advance(self, ms):
+        """
+        Move the clock `ms` forward, firing everything that falls due.
+        """
+        end = self.now + ms
+        while True:
+            due_timer = self.timers[0][0] if self.timers else math.inf
+            due = min(due_timer, self.next_frame)
+            if due > end:
+                break
+            self.now = due
+            if self.next_frame <= due_timer:
+                self.next_frame += self.frame_period
+                frames, self.frames = self.frames, []
+                for callback in frames:
+                    callback(self.now)
+            else:
+                timer = heapq.heappop(self.timers)
+                if timer[3] is not None:
+                    timer[0] += timer[3]
+                    heapq.heappush(self.timers, timer)
+                timer[2]()
+        self.now = end
+
+
+class Thenable:
+    """
+    Already settled promise, `then` callbacks run immediately.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def then(self, callback, errback=None):
+        result = callback(self.value)
+        return result if isinstance(result, Thenable) else Thenable(result)
+
+    def catch(self, errback):
+        return self
+
+
+class Response:
+    def __init__(self, status=404, body='{}'):
+        self.status = status
+        self.ok = 200 <= status < 300
+        self.body = body
+
+    def json(self):
+        return Thenable(json.loads(self.body))
+
+    def text(self):
+        return Thenable(self.body)
+
+
+def ArrayBuffer(length):
+    return bytearray(length)
+
+
+class DataView:
+    """
+    The setters of a JavaScript `DataView`, writing into a bytearray.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def set(self, code, offset, value, little_endian):
+        struct.pack_into(('<' if little_endian else '>') + code, self.buffer, offset, value)
+
+    def setUint8(self, offset, value):
+        self.set('B', offset, int(value), False)
+
+    def setUint16(self, offset, value, little_endian=False):
+        self.set('H', offset, int(value), little_endian)
+
+    def setUint32(self, offset, value, little_endian=False):
+        self.set('I', offset, int(value), little_endian)
+
+    def setFloat32(self, offset, value, little_endian=False):
+        self.set('f', offset, value, little_endian)
+
+    def setFloat64(self, offset, value, little_endian=False):
+        self.set('d', offset, value, little_endian)
+
+
+class Element:
+    def __init__(self, element_id):
+        self.id = element_id
+        self.style = SimpleNamespace()
+        self.listeners = {}
+
+    def addEventListener(self, kind, listener):
+        self.listeners.setdefault(kind, []).append(listener)
+
+
+class Document:
+    def __init__(self):
+        self.elements = {}
+
+    def getElementById(self, element_id):
+        return self.elements.setdefault(element_id, Element(element_id))
+
+
+class Storage:
+    def __init__(self):
+        self.items = {}
+
+    def getItem(self, key):
+        return self.items.get(key)
+
+    def setItem(self, key, value):
+        self.items[key] = str(value)
+
+    def removeItem(self, key):
+        self.items.pop(key, None)
+
+
+class Window:
+    def __init__(self, clock, width=1280, height=800, search=''):
+        self.clock = clock
+        self.location = SimpleNamespace(pathname='/', search=search)
+        self.innerWidth = width
+        self.innerHeight = height
+        self.listeners = {}
+        self.requests = []  # (url, options) of every fetch
+        self.respond = lambda url, options: Response()  # by default there's no server behind the page
+        self.performance = SimpleNamespace(now=lambda: clock.now)
+        self.JSON = SimpleNamespace(stringify=json.dumps, parse=json.loads)
+        self.sessionStorage = Storage()
+        self.localStorage = Storage()
+        self.console = SimpleNamespace(log=print)
+        self.onresize = None
+        self.onkeydown = None
+
+    def __getattr__(self, name):  # globals the page didn't set are undefined, as in JavaScript
+        return None
+
+    def setInterval(self, callback, period):
+        return self.clock.set_interval(callback, period)
+
+    def setTimeout(self, callback, delay):
+        return self.clock.set_timeout(callback, delay)
+
+    def requestAnimationFrame(self, callback):
+        return self.clock.request_animation_frame(callback)
+
+    def addEventListener(self, kind, listener):
+        self.listeners.setdefault(kind, []).append(listener)
+
+    def fetch(self, url, options=None):
+        self.requests.append((url, options))
+        return Thenable(self.respond(url, options))
+
+    def dispatch(self, kind, **fields):
+        """
+        Fire a DOM event at the window, `fields` become attributes of the event.
+        """
+        event = SimpleNamespace(type=kind, timeStamp=self.clock.now, **fields)
+        handler = getattr(self, f'on{kind}', None)
+        if handler is not None:
+            handler(event)
+        for listener in self.listeners.get(kind, []):
+            listener(event)
+        return event
+
+
+class Browser:
+    """
+    One page worth of browser globals sharing a virtual clock, exposed as a
+    module that can stand in for `org.transcrypt.stubs.browser`.
+    """
+
+    def __init__(self, seed=None, refresh_rate=60, search=''):
+        self.clock = VirtualClock(refresh_rate)
+        self.random = random.Random(seed)
+        self.window = Window(self.clock, search=search)
+        self.document = Document()
+        self.Math = self.make_math()
+        self.Date = self.make_date()
+
+    def make_math(self):
+        rng = self.random
+        return SimpleNamespace(
+            PI=math.pi, E=math.e,
+            random=rng.random,
+            floor=math.floor, ceil=math.ceil, sqrt=math.sqrt,
+            round=lambda x: math.floor(x + 0.5),  # JavaScript rounds halves up
+            abs=abs, max=max, min=min, pow=pow,
+            sin=math.sin, cos=math.cos, tan=math.tan, atan=math.atan, atan2=math.atan2,
+            log=math.log, exp=math.exp,
+        )
+
+    def make_date(self):
+        clock = self.clock
+
+        class Date:
+            def __init__(self):
+                self.time = EPOCH + clock.now
+
+            def __pos__(self):  # `+ __new__ (Date)` gives ms since 1970
+                return self.time
+
+            def getTime(self):
+                return self.time
+
+        return Date
+
+    def module(self):
+        stub = ModuleType('org.transcrypt.stubs.browser')
+        stub.__pragma__ = lambda *args: None
+        stub.__new__ = lambda value: value() if isinstance(value, type) else value
+        stub.document = self.document
+        stub.window = self.window
+        stub.console = self.window.console
+        stub.Math = self.Math
+        stub.Date = self.Date
+        stub.ArrayBuffer = ArrayBuffer
+        stub.DataView = DataView
+        stub.rgb = lambda red, green, blue: f'rgb({red},{green},{blue})'
+        return stub
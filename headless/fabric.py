@@ -0,0 +1,88 @@
+"""
+Minimal stand-in for the parts of fabric.js the games use. Objects only
+keep their properties, nothing is rendered.
+"""
+from types import ModuleType, SimpleNamespace
+
+
+class FabricObject:
+    def __init__(self, options=None):
+        self.visible = True
+        self.set(options or {})
+
+    def set(self, key, value=None):
+        if isinstance(key, dict):
+            for name, option in key.items():
+                setattr(self, name, option)
+        else:
+            setattr(self, key, value)
+        return self
+
+    def setCoords(self):
+        return self
+
+
+class Rect(FabricObject):
+    pass
+
+
+class Text(FabricObject):
+    def __init__(self, text, options=None):
+        self.text = text
+        FabricObject.__init__(self, options)
+
+
+class Line(FabricObject):
+    def __init__(self, points, options=None):
+        self.x1, self.y1, self.x2, self.y2 = points
+        FabricObject.__init__(self, options)
+
+
+class Canvas:
+    def __init__(self, element, options=None):
+        self.element = element
+        self.width = 300  # size of an unstyled <canvas>
+        self.height = 150
+        self.backgroundColor = ''
+        self.viewportTransform = [1, 0, 0, 1, 0, 0]
+        self.objects = []
+        self.renders = 0
+        for name, option in (options or {}).items():
+            setattr(self, name, option)
+
+    def add(self, *objects):
+        self.objects.extend(objects)
+        return self
+
+    def clear(self):
+        self.objects = []
+        return self
+
+    def getObjects(self):
+        return self.objects
+
+    def renderAll(self):
+        self.renders += 1
+        return self
+
+    def setDimensions(self, dimensions):
+        self.width = dimensions.get('width', self.width)
+        self.height = dimensions.get('height', self.height)
+        return self
+
+    def setViewportTransform(self, transform):
+        self.viewportTransform = transform
+        return self
+
+    def setZoom(self, zoom):
+        self.viewportTransform = [zoom, 0, 0, zoom] + self.viewportTransform[4:]
+        return self
+
+
+def module():
+    """
+    :return: module that can stand in for Transcrypt's `com.fabricjs`
+    """
+    stub = ModuleType('com.fabricjs')
+    stub.fabric = SimpleNamespace(Canvas=Canvas, Rect=Rect, Text=Text, Line=Line)
+    return stub
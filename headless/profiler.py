@@ -0,0 +1,95 @@
+"""
+Per-call cost of the game loop methods, measured on a headless run.
+
+    python -m headless.profiler ktask --seconds 600
+"""
+import argparse
+import functools
+import time
+
+from headless import load
+
+METHODS = ('predict', 'interact', 'commit', 'update', 'update_squares', 'frame', 'draw', 'integrate', 'clamp', 'project')
+
+
+def instrument(module, timings, methods=METHODS):
+    """
+    Wrap `methods` of every class defined in `module` so each call adds to
+    `timings[<class>.<method>] = [calls, seconds]`. Times are inclusive, so
+    a subclass calling e.g. `Sprite.predict (self)` also counts towards it.
+    """
+    def timed(name, function):
+        entry = timings.setdefault(name, [0, 0.0])
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                entry[0] += 1
+                entry[1] += time.perf_counter() - start
+        return wrapper
+
+    for value in list(vars(module).values()):
+        if isinstance(value, type) and value.__module__ == module.__name__:
+            for method in methods:
+                if method in vars(value):
+                    setattr(value, method, timed(f'{value.__name__}.{method}', vars(value)[method]))
+
+
+def rebind(callback):
+    """
+    Bound methods captured by timers before instrumenting still point at the
+    original functions, look them up again.
+    """
+    owner = getattr(callback, '__self__', None)
+    if owner is None:
+        return callback
+    return getattr(owner, callback.__func__.__name__)
+
+
+def profile(name, seconds, seed=None, step=100, search=''):
+    """
+    Run game `name` for `seconds` of virtual time, restarting it with the
+    spacebar whenever it pauses.
+
+    :return: timings as in `instrument`, and the wall clock time taken
+    """
+    page = load(name, seed=seed, search=search)
+    timings = {}
+    instrument(page.module, timings)
+    page.clock.rebind(rebind)
+
+    start = time.perf_counter()
+    for _ in range(int(seconds * 1000 // step)):
+        if page.game.pause:
+            page.press(' ')
+            page.run(step)
+            page.release()
+        else:
+            page.run(step)
+    return timings, time.perf_counter() - start
+
+
+def report(timings, elapsed):
+    lines = [f'{"method":<28}{"calls":>12}{"total ms":>12}{"us/call":>10}']
+    for name, (calls, seconds) in sorted(timings.items(), key=lambda item: -item[1][1]):
+        if calls:
+            lines.append(f'{name:<28}{calls:>12}{seconds * 1e3:>12.1f}{seconds / calls * 1e6:>10.2f}')
+    lines.append(f'wall clock: {elapsed:.2f} s')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('game', choices=('ktask', 'pong'))
+    parser.add_argument('--seconds', type=float, default=60, help='virtual time to simulate')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--search', default='', help="query string of the page, e.g. '?batched'")
+    args = parser.parse_args(argv)
+    print(report(*profile(args.game, args.seconds, seed=args.seed, search=args.search)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Check that `Game.encode` in `static/ktask.py` packs a batch of trials
+exactly as `trial_store.decode_batch` reads it back.
+
+    python -m headless.roundtrip
+"""
+import sys
+
+from headless import load
+from trial_store import TRIAL_DTYPE, decode_batch, trials_to_records
+
+# every field set, ints at the top of their range so a shifted or narrowed field shows
+TRIALS = [{
+    'trial': 4294967295 - index,
+    'block': 65535 - index,
+    'seed': 2863311530 + index,
+    'setSize': 255 - index,
+    'key': 65535 - index,
+    'changed': 1,
+    'correct': index % 2,
+    'rt': 1234.5678 + index,
+    'durations': [1000.25 + index, 250.5, 750.125, 500.0625],
+    'droppedFrames': 65535 - index,
+    'refreshRate': 143.86 + index,
+} for index in range(3)]
+
+
+def check(trials=TRIALS, pending=7):
+    """
+    Encode `trials` with the experiment's own code in the headless harness
+    and decode them as the server does.
+
+    :raise ValueError: naming the fields or header values that differ
+    """
+    game = load('ktask', seed=0).game
+    game.pending = pending
+    session, decoded_pending, records = decode_batch(bytes(game.encode(trials)))
+    expected = trials_to_records(trials)
+    differing = [name for name in TRIAL_DTYPE.names if not (records[name] == expected[name]).all()]
+    if session != game.session:
+        differing.append('session')
+    if decoded_pending != pending:
+        differing.append('pending')
+    if differing:
+        raise ValueError(f"Game.encode and TRIAL_DTYPE disagree on {', '.join(differing)}")
+
+
+def main():
+    try:
+        check()
+    except ValueError as e:
+        sys.exit(str(e))
+    print('binary batches round-trip')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Simulate participants running the experiment and report latency per route.
+
+Every simulated participant loads the page, fetches the compiled experiment
+through its cache-busted URLs, asks to resume its session and for its first
+set size, and then runs trials at the pace of a real participant: each
+response goes to the staircase, and every tenth trial a batch is posted.
+
+    python loadtest.py --participants 50 --duration 60
+
+starts app.py on a development server with a throwaway trial store. To find
+where a production setup saturates, start it yourself and point at it:
+
+    gunicorn app:app --workers 2
+    python loadtest.py --url http://127.0.0.1:33507 --participants 400 --speedup 10
+
+Batches are posted in the experiment's binary format unless `--json` is
+given. Apart from computing the asset URLs with the app's `url_for` and
+packing batches with `trial_store`'s record layout, only the standard
+library is used.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import string
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from trial_store import BATCH_HEADER, BATCH_MAGIC, BATCH_MIMETYPE, BATCH_VERSION, trials_to_records
+
+TRIAL_MS = 2500  # memory, blank, test and intertrial displays
+TRIALS_PER_BATCH = 10  # as in static/ktask.py
+
+
+class Recorder:
+    """
+    Collects latencies and failures per route, from many threads.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def add(self, route, seconds, ok):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, elapsed):
+        lines = [f'{"route":<28}{"requests":>10}{"errors":>8}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"req/s":>9}']
+        for route, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            lines.append(
+                f'{route:<28}{len(latencies):>10}{self.errors.get(route, 0):>8}'
+                f'{percentile(latencies, 50) * 1e3:>9.1f}{percentile(latencies, 95) * 1e3:>9.1f}'
+                f'{percentile(latencies, 99) * 1e3:>9.1f}{len(latencies) / elapsed:>9.1f}'
+            )
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        lines.append(f'{total} requests in {elapsed:.1f} s, {total / elapsed:.1f} req/s')
+        return '\n'.join(lines)
+
+
+def percentile(ordered, percent):
+    """
+    :param ordered: sorted values
+    :return: nearest-rank percentile
+    """
+    if not ordered:
+        return float('nan')
+    return ordered[max(0, -(-len(ordered) * percent // 100) - 1)]
+
+
+def asset_urls():
+    """
+    :return: cache-busted URLs of every compiled module, as `url_for` builds them
+    """
+    from flask import url_for
+    from app import app, cache_buster
+
+    with app.test_request_context():
+        return [
+            url_for('static', filename=filename)
+            for filename in sorted(cache_buster.bust_map)
+            if filename.startswith('__target__' + os.sep)
+        ]
+
+
+def synthetic_trial(seed, trial, set_size):
+    return {
+        'trial': trial,
+        'block': trial // 50,
+        'seed': seed,
+        'setSize': set_size,
+        'key': random.choice((70, 74)),
+        'changed': random.randint(0, 1),
+        'correct': random.randint(0, 1),
+        'rt': random.uniform(300, 1200),
+        'durations': [1000 + random.uniform(-8, 8), 250 + random.uniform(-8, 8), 750 + random.uniform(-8, 8), 500],
+        'droppedFrames': 0,
+        'refreshRate': 60,
+    }
+
+
+def encode_batch(session, pending, trials):
+    """
+    :return: body of a binary batch upload, as `Game.encode` in static/ktask.py builds it
+    """
+    records = trials_to_records(trials)
+    return BATCH_HEADER.pack(BATCH_MAGIC, BATCH_VERSION, pending, len(records), session.encode('ascii')) + records.tobytes()
+
+
+class Participant(threading.Thread):
+    def __init__(self, index, address, assets, recorder, deadline, trial_interval, delay, binary=True):
+        super().__init__(daemon=True)
+        self.session = f'load-{index}-' + ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+        self.seed = random.getrandbits(32)
+        self.address = address
+        self.assets = assets
+        self.recorder = recorder
+        self.deadline = deadline
+        self.trial_interval = trial_interval
+        self.delay = delay
+        self.binary = binary
+        self.set_size = 6  # until the staircase has chosen, as in static/ktask.py
+        self.connection = None
+
+    def request(self, route, method, path, body=None, headers=None):
+        """
+        :return: the response body, None if the request failed
+        """
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(*self.address, timeout=60)
+        start = time.perf_counter()
+        data = None
+        try:
+            self.connection.request(method, path, body=body, headers=headers or {})
+            response = self.connection.getresponse()
+            data = response.read()
+            ok = response.status < 400 or (route == '/sessions/<id>/resume' and response.status == 404)
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            ok = False
+        self.recorder.add(route, time.perf_counter() - start, ok)
+        return data if ok else None
+
+    def staircase(self, body=None):
+        """
+        Report a response to the staircase, or just ask it, and follow its
+        choice of set size like the experiment does.
+        """
+        path = f'/sessions/{self.session}/staircase'
+        if body is None:
+            data = self.request('/sessions/<id>/staircase', 'GET', path)
+        else:
+            data = self.request('/sessions/<id>/staircase', 'POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+        if data:
+            self.set_size = json.loads(data).get('setSize', self.set_size)
+
+    def run(self):
+        time.sleep(self.delay)
+        self.request('/', 'GET', '/')
+        for url in self.assets:
+            self.request('/static/__target__/*', 'GET', url)
+        self.request('/sessions/<id>/resume', 'GET', f'/sessions/{self.session}/resume')
+        self.staircase()
+
+        trial = 0
+        trials = []
+        while True:
+            wake = time.monotonic() + self.trial_interval
+            if wake > self.deadline:
+                break
+            time.sleep(self.trial_interval)
+            trials.append(synthetic_trial(self.seed, trial, self.set_size))
+            self.staircase({'trial': trial, 'setSize': self.set_size, 'correct': trials[-1]['correct']})
+            if len(trials) >= TRIALS_PER_BATCH:
+                if self.binary:
+                    body, content_type = encode_batch(self.session, 1, trials), BATCH_MIMETYPE
+                else:
+                    body, content_type = json.dumps({'session': self.session, 'pending': 1, 'trials': trials}), 'application/json'
+                self.request('/trials', 'POST', '/trials', body, {'Content-Type': content_type})
+                trials = []
+            trial += 1
+        if self.connection is not None:
+            self.connection.close()
+
+
+def start_local_server():
+    """
+    Serve app.py on a free port, storing trials in a temporary directory.
+
+    :return: (host, port), and a function stopping the server
+    """
+    from werkzeug.serving import make_server
+
+    os.environ.setdefault('TRIAL_STORE', tempfile.mkdtemp(prefix='loadtest-'))
+    from app import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # one log line per request would drown the report
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return ('127.0.0.1', server.server_port), server.shutdown
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='server to test, by default app.py is started locally')
+    parser.add_argument('--participants', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=60, help='seconds to run')
+    parser.add_argument('--ramp', type=float, default=5, help='seconds over which participants arrive')
+    parser.add_argument('--json', action='store_true', help='post batches as JSON, like clients that fell back to it')
+    parser.add_argument('--speedup', type=float, default=1, help='run trials this many times faster than real participants')
+    args = parser.parse_args(argv)
+
+    stop = None
+    if args.url:
+        parsed = urllib.parse.urlsplit(args.url)
+        address = (parsed.hostname, parsed.port or 80)
+    else:
+        address, stop = start_local_server()
+
+    assets = asset_urls()
+    recorder = Recorder()
+    start = time.monotonic()
+    participants = [
+        Participant(
+            index, address, assets, recorder,
+            deadline=start + args.duration,
+            trial_interval=TRIAL_MS / 1000 / args.speedup,
+            delay=random.uniform(0, args.ramp),
+            binary=not args.json,
+        )
+        for index in range(args.participants)
+    ]
+    for participant in participants:
+        participant.start()
+    for participant in participants:
+        participant.join()
+    elapsed = time.monotonic() - start
+
+    if stop is not None:
+        stop()
+    print(recorder.report(elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import numpy
+
+# colours the experiment draws squares from, in static/
+PALETTE = 'palette.csv'
+PALETTE_SIZE = 24  # more than the largest set size, one colour is left for a changed probe
+MIN_DELTA_E = 35  # CIE76 distance every two colours of the palette are at least apart
+BACKGROUND = (128, 128, 128)  # the canvas' 'grey', squares must stand out from it
+LEVELS = 18  # candidates per sRGB channel
+
+WHITE = numpy.array([0.95047, 1.0, 1.08883])  # D65
+SRGB_TO_XYZ = numpy.array([
+    [0.4124, 0.3576, 0.1805],
+    [0.2126, 0.7152, 0.0722],
+    [0.0193, 0.1192, 0.9505],
+])
+
+
+def srgb_to_lab(rgb):
+    """
+    :param rgb: array of shape (..., 3), 0-255 sRGB
+    :return: array of shape (..., 3), CIELAB under D65
+    """
+    c = numpy.asarray(rgb, dtype='f8') / 255
+    linear = numpy.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    t = linear @ SRGB_TO_XYZ.T / WHITE
+    f = numpy.where(t > (6 / 29) ** 3, numpy.cbrt(t), t / (3 * (6 / 29) ** 2) + 4 / 29)
+    return numpy.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def generate_palette(size=PALETTE_SIZE, background=BACKGROUND, levels=LEVELS):
+    """
+    Pick `size` colours spread far apart in CIELAB by farthest point
+    sampling over a grid of sRGB colours, starting far from `background`.
+
+    :return: (size, 3) sRGB colours, their (size, 3) CIELAB coordinates and
+        the smallest CIE76 distance between two of them
+    """
+    axis = numpy.linspace(0, 255, levels).round()
+    candidates = numpy.stack(numpy.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    lab = srgb_to_lab(candidates)
+    # distance of every candidate to its nearest chosen colour, the background counting as chosen
+    nearest = numpy.linalg.norm(lab - srgb_to_lab(background), axis=1)
+    chosen = []
+    for _ in range(size):
+        pick = int(numpy.argmax(nearest))
+        chosen.append(pick)
+        nearest = numpy.minimum(nearest, numpy.linalg.norm(lab - lab[pick], axis=1))
+    lab = lab[chosen]
+    distances = numpy.linalg.norm(lab[:, None] - lab[None], axis=-1)
+    return candidates[chosen].astype(int), lab, distances[numpy.triu_indices(size, 1)].min()
+
+
+def write_palette(path, size=PALETTE_SIZE, min_delta_e=MIN_DELTA_E):
+    """
+    Generate the palette and write it as CSV, one `#rrggbb` colour and its
+    CIELAB coordinates per line.
+
+    :raise ValueError: if `size` colours can't be `min_delta_e` apart
+    """
+    rgb, lab, delta_e = generate_palette(size)
+    if delta_e < min_delta_e:
+        raise ValueError(f"{size} colours are only {delta_e:.1f} apart, {min_delta_e} needed")
+    with open(path, 'w') as f:
+        f.write('color,L,a,b\n')
+        for (red, green, blue), (l, a, b) in zip(rgb, lab):
+            f.write(f'#{red:02x}{green:02x}{blue:02x},{l:.2f},{a:.2f},{b:.2f}\n')
+    return delta_e
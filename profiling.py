@@ -0,0 +1,169 @@
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+
+from flask import abort, jsonify, request, send_from_directory
+from itsdangerous import BadSignature, TimestampSigner
+
+HEADER = 'X-Profile'
+SALT = 'request-profiler'
+MAX_FILES = 100
+TOKEN_AGE = 24 * 60 * 60  # seconds a token stays valid
+
+UNSAFE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class RequestProfiler:
+    """
+    Run selected requests under cProfile and keep their stats as `.pstats`
+    files in a directory holding at most `max_files` of them.
+
+    A request is profiled if it carries a `X-Profile` header with a token
+    signed with `secret` (see `token`), or if it falls into the random
+    `sample_rate` fraction of requests. With neither configured the app is
+    left untouched, otherwise a request that isn't selected costs a header
+    lookup and, when sampling, one random number.
+
+    With a `secret`, `<url_prefix>/` lists the stored profiles and
+    `<url_prefix>/<name>` downloads one, both only for requests carrying a
+    valid token in the header or a `token` query argument.
+    """
+
+    def __init__(self, app=None, config=None):
+        if not (config is None or isinstance(config, dict)):
+            raise ValueError("`config` must be an instance of dict or None")
+
+        self.app = app
+        self.config = config or {}
+        self.directory = self.config.get('directory', 'profiles')
+        self.secret = self.config.get('secret')
+        self.sample_rate = self.config.get('sample_rate', 0)
+        self.max_files = self.config.get('max_files', MAX_FILES)
+        self.url_prefix = self.config.get('url_prefix', '/_profiles')
+        self.signer = TimestampSigner(self.secret, salt=SALT) if self.secret else None
+        self.lock = threading.Lock()
+        if self.app is not None:
+            self.register_profiler(app)
+
+    def token(self):
+        """
+        :return: value of the `X-Profile` header that turns profiling on
+        """
+        if self.signer is None:
+            raise ValueError("no `secret` in the profiler's config")
+        return self.signer.sign('profile').decode()
+
+    def authorized(self, token):
+        """
+        :param token: token sent by the client, may be None
+        :return: True if `token` was signed with our secret and has not expired
+        """
+        if not token or self.signer is None:
+            return False
+        try:
+            self.signer.unsign(token, max_age=TOKEN_AGE)
+        except BadSignature:
+            return False
+        return True
+
+    def selected(self, environ):
+        """
+        :param environ: WSGI environment of the request
+        :return: True if the request should be profiled
+        """
+        if environ.get('PATH_INFO', '').startswith(self.url_prefix):
+            return False
+        token = environ.get('HTTP_X_PROFILE')
+        if token is not None and self.authorized(token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def filename(self, environ):
+        """
+        :return: name of the stats file of a request, sorting by time
+        """
+        now = time.time()
+        route = UNSAFE.sub('_', environ.get('PATH_INFO', '/').strip('/'))[:80] or 'root'
+        return (
+            f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}.{int(now % 1 * 1e6):06d}"
+            f"-{os.getpid()}-{environ.get('REQUEST_METHOD', 'GET')}-{route}.pstats"
+        )
+
+    def profiles(self):
+        """
+        :return: names of the stored stats files, oldest first
+        """
+        try:
+            return sorted(name for name in os.listdir(self.directory) if name.endswith('.pstats'))
+        except FileNotFoundError:
+            return []
+
+    def save(self, profile, environ):
+        """
+        Write the stats of a profiled request, then drop the oldest files
+        beyond `max_files`.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.filename(environ))
+        profile.dump_stats(path + '.tmp')
+        os.replace(path + '.tmp', path)  # the listing never shows a partly written file
+        with self.lock:
+            for name in self.profiles()[:-self.max_files]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:  # removed by another worker
+                    pass
+
+    def register_profiler(self, app):
+        """
+        Wrap `app.wsgi_app` so selected requests are profiled, and add the
+        routes listing and serving the profiles.
+        """
+        if not (self.signer or self.sample_rate > 0):
+            return
+
+        wsgi_app = app.wsgi_app
+
+        def profiling_wsgi_app(environ, start_response):
+            """
+            Call the app, under cProfile if the request is selected. Only
+            the call is profiled, not the iteration over a streamed body.
+            """
+            if not self.selected(environ):
+                return wsgi_app(environ, start_response)
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(wsgi_app, environ, start_response)
+            finally:
+                self.save(profile, environ)
+
+        app.wsgi_app = profiling_wsgi_app
+
+        if self.signer is None:
+            return
+
+        def require_token():
+            if not self.authorized(request.headers.get(HEADER) or request.args.get('token')):
+                abort(403)
+
+        def list_profiles():
+            """
+            List the stored profiles, newest first.
+            """
+            require_token()
+            return jsonify({'profiles': self.profiles()[::-1]})
+
+        def download_profile(name):
+            """
+            Serve one stored profile, load it with `pstats.Stats(<file>)`.
+            """
+            require_token()
+            if not name.endswith('.pstats'):
+                abort(404)
+            return send_from_directory(os.path.abspath(self.directory), name, as_attachment=True)
+
+        app.add_url_rule(self.url_prefix + '/', 'list_profiles', list_profiles)
+        app.add_url_rule(self.url_prefix + '/<name>', 'download_profile', download_profile)
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe mapping holding at most `maxsize` entries, each for at most
+    `ttl` seconds. When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize, ttl):
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expiry time, value), least recently used first
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            return default if entry is None else entry[1]
+
+
+class SessionProgress:
+    """
+    Where a participant is in the experiment. Slots keep the record at a
+    few dozen bytes, instead of carrying an instance dict per session.
+    """
+    __slots__ = ('block', 'trial', 'seed', 'pending', 'stored')
+
+    def __init__(self, block=0, trial=0, seed=0, pending=0, stored=0):
+        self.block = block
+        self.trial = trial  # index of the next trial to run
+        self.seed = seed
+        self.pending = pending  # batches the client had not seen acknowledged yet
+        self.stored = stored  # records in the trial store when this was recorded
+
+    def as_dict(self):
+        return {'block': self.block, 'trial': self.trial, 'seed': self.seed, 'pending': self.pending}
+
+
+class SessionStore:
+    """
+    In-memory progress of the sessions a worker has seen recently, backed
+    by the durable `TrialStore` for sessions it has not, or for which
+    another worker has stored trials since.
+    """
+
+    def __init__(self, trial_store, maxsize=50000, ttl=6 * 60 * 60):
+        self.trial_store = trial_store
+        self.cache = LRUCache(maxsize, ttl)
+
+    def record(self, session, block, trial, seed, pending):
+        """
+        Update a session's progress after a batch of its trials was stored.
+        """
+        stored = self.trial_store.count(session)
+        progress = self.cache.get(session)
+        if progress is None:
+            self.cache.put(session, SessionProgress(block, trial, seed, pending, stored))
+        else:
+            progress.block, progress.trial, progress.seed, progress.pending = block, trial, seed, pending
+            progress.stored = stored
+
+    def progress(self, session):
+        """
+        :param session: session id
+        :return: the session's `SessionProgress`, None if it never stored a trial
+        """
+        stored = self.trial_store.count(session)
+        progress = self.cache.get(session)
+        if progress is not None and progress.stored == stored:
+            return progress
+
+        # another worker, or this one before a restart or eviction, served the session
+        last = self.trial_store.last(session)
+        if last is None:
+            return None
+        progress = SessionProgress(int(last['block']), int(last['trial']) + 1, int(last['seed']), stored=stored)
+        self.cache.put(session, progress)
+        return progress
@@ -0,0 +1,207 @@
+import os
+import threading
+
+import numpy
+
+from session_store import LRUCache
+from trial_store import check_integer
+
+SET_SIZES = numpy.arange(1, 9)  # as many as the experiment has squares
+CAPACITIES = numpy.linspace(0, 8, 161)  # grid the posterior over capacity K is kept on
+GUESS = 0.5  # chance of a correct answer on a change/same probe without memory
+LAPSE = 0.04  # share of trials answered at chance whatever the load
+
+
+def p_correct(set_sizes, capacities, guess=GUESS, lapse=LAPSE):
+    """
+    Probability of a correct single-probe change detection, after Cowan:
+    the probed item is in memory with probability min(K, N) / N, otherwise
+    the participant guesses.
+
+    :return: array of shape (len(set_sizes), len(capacities))
+    """
+    set_sizes = numpy.asarray(set_sizes, dtype='f8')[:, None]
+    stored = numpy.minimum(capacities, set_sizes) / set_sizes
+    return lapse * guess + (1 - lapse) * (stored + (1 - stored) * guess)
+
+
+def entropy(p, axis=-1):
+    return -(p * numpy.log(numpy.where(p > 0, p, 1))).sum(axis=axis)
+
+
+# one fixed-width record per response, appended by whichever worker receives it
+RESPONSE_DTYPE = numpy.dtype([
+    ('trial', '<u4'),
+    ('set_size', '<u1'),
+    ('correct', '<u1'),
+])
+
+
+class ResponseLog:
+    """
+    Append-only file of `RESPONSE_DTYPE` records per session, next to the
+    session's trials. Shared by all workers, so each of them can fold in
+    the responses the others received.
+
+    Appends to one session's log must not overlap within a process,
+    `Staircase` holds the session's lock for them.
+    """
+
+    def __init__(self, trial_store):
+        self.trial_store = trial_store
+
+    def path(self, session):
+        return os.path.splitext(self.trial_store.path(session))[0] + '.responses'
+
+    def append(self, session, trial, set_size, correct):
+        record = numpy.array([(trial, set_size, correct)], dtype=RESPONSE_DTYPE)
+        with open(self.path(session), 'ab') as f:
+            torn = f.tell() % RESPONSE_DTYPE.itemsize
+            if torn:  # drop what an interrupted write left behind
+                f.truncate(f.tell() - torn)
+            f.write(record.tobytes())
+
+    def read(self, session, start=0):
+        """
+        :return: the session's responses from the `start`th on
+        """
+        try:
+            with open(self.path(session), 'rb') as f:
+                f.seek(start * RESPONSE_DTYPE.itemsize)
+                data = f.read()
+        except FileNotFoundError:
+            return numpy.empty(0, dtype=RESPONSE_DTYPE)
+        return numpy.frombuffer(data, dtype=RESPONSE_DTYPE, count=len(data) // RESPONSE_DTYPE.itemsize)
+
+
+class StaircaseState:
+    """
+    Posterior over capacity of one session, how many of the session's
+    logged responses it includes, and the next trial it expects. Its lock
+    guards the session's log and folding in responses, so sessions don't
+    wait on each other's file I/O.
+    """
+    __slots__ = ('posterior', 'folded', 'trial', 'lock')
+
+    def __init__(self, posterior, folded=0, trial=0):
+        self.posterior = posterior
+        self.folded = folded
+        self.trial = trial
+        self.lock = threading.Lock()
+
+
+class Staircase:
+    """
+    QUEST-style adaptive choice of set size. Every response multiplies the
+    session's posterior over capacity by the likelihood of that response,
+    and the next set size is the one whose response is expected to tell
+    most about capacity.
+
+    Responses are appended to the session's `ResponseLog`. Posteriors of
+    recently active sessions are kept in memory, and on every request a
+    worker folds in the responses logged since, whichever worker
+    received them. So all workers converge on the same posterior.
+    """
+
+    def __init__(self, trial_store, set_sizes=SET_SIZES, capacities=CAPACITIES, maxsize=10000, ttl=6 * 60 * 60):
+        self.log = ResponseLog(trial_store)
+        self.set_sizes = numpy.asarray(set_sizes)
+        self.capacities = numpy.asarray(capacities, dtype='f8')
+        correct = p_correct(self.set_sizes, self.capacities)
+        # likelihood[set size index, correct] over the capacity grid
+        self.likelihood = numpy.stack([1 - correct, correct], axis=1)
+        self.prior = numpy.full(len(self.capacities), 1 / len(self.capacities))
+        self.cache = LRUCache(maxsize, ttl)
+        self.lock = threading.Lock()
+
+    def index(self, set_sizes):
+        """
+        :return: rows of `likelihood` for `set_sizes`
+        :raise ValueError: if a set size is not one the staircase chooses from
+        """
+        set_sizes = numpy.asarray(set_sizes)
+        index = numpy.searchsorted(self.set_sizes, set_sizes)
+        if not numpy.array_equal(self.set_sizes[numpy.minimum(index, len(self.set_sizes) - 1)], set_sizes):
+            raise ValueError(f"set sizes must be in {self.set_sizes.tolist()}")
+        return index
+
+    def cached(self, session):
+        """
+        :return: the session's cached `StaircaseState`, a new one at the
+            prior if there is none
+        """
+        self.log.path(session)  # validates the session id
+        with self.lock:  # only so two requests don't both create the session's state
+            state = self.cache.get(session)
+            if state is None:
+                state = StaircaseState(self.prior)
+                self.cache.put(session, state)
+            return state
+
+    def fold(self, session, state):
+        """
+        Take the responses logged since `state` was last updated into
+        account. The caller holds `state.lock`.
+        """
+        responses = self.log.read(session, state.folded)
+        if len(responses):
+            usable = responses[numpy.isin(responses['set_size'], self.set_sizes)]
+            log_posterior = numpy.log(state.posterior) + numpy.log(
+                self.likelihood[self.index(usable['set_size']), (usable['correct'] != 0).astype(int)]
+            ).sum(axis=0)
+            posterior = numpy.exp(log_posterior - log_posterior.max())
+            state.posterior = posterior / posterior.sum()
+            state.folded += len(responses)
+            state.trial = max(state.trial, int(responses['trial'].max()) + 1)
+
+    def state(self, session):
+        """
+        :return: the session's `StaircaseState`, including every response
+            logged so far
+        """
+        state = self.cached(session)
+        with state.lock:
+            self.fold(session, state)
+        return state
+
+    def update(self, session, trial, set_size, correct):
+        """
+        Log a response, then take it and those other workers logged into
+        account.
+
+        :param trial: index of the trial the response was given in
+        :param correct: 0, 1, False or True
+        :return: the session's `StaircaseState`
+        :raise ValueError: if a value is of the wrong type or out of range
+        """
+        check_integer('trial', trial, RESPONSE_DTYPE['trial'])
+        self.index([check_integer('setSize', set_size, RESPONSE_DTYPE['set_size'])])
+        if correct not in (0, 1) or not isinstance(correct, int):
+            raise ValueError('`correct` must be 0, 1, false or true')
+        state = self.cached(session)
+        with state.lock:
+            self.log.append(session, trial, set_size, int(correct))
+            self.fold(session, state)
+        return state
+
+    def information_gain(self, posterior):
+        """
+        :return: expected reduction of the posterior's entropy, per set size
+        """
+        joint = self.likelihood * posterior  # (set size, response, capacity)
+        p_response = joint.sum(axis=-1)
+        conditional = joint / numpy.where(p_response > 0, p_response, 1)[..., None]
+        return entropy(posterior) - (p_response * entropy(conditional)).sum(axis=-1)
+
+    def summary(self, state):
+        """
+        :return: next set size and capacity estimate, as sent to the client
+        """
+        posterior = state.posterior
+        mean = float(posterior @ self.capacities)
+        return {
+            'setSize': int(self.set_sizes[numpy.argmax(self.information_gain(posterior))]),
+            'capacity': mean,
+            'sd': float(numpy.sqrt(posterior @ (self.capacities - mean) ** 2)),
+            'trial': state.trial,
+        }
@@ -1,35 +1,67 @@
 'use strict';import{AssertionError,AttributeError,BaseException,DeprecationWarning,Exception,IndexError,IterableError,KeyError,NotImplementedError,RuntimeWarning,StopIteration,UserWarning,ValueError,Warning,__JsIterator__,__PyIterator__,__Terminal__,__add__,__and__,__call__,__class__,__envir__,__eq__,__floordiv__,__ge__,__get__,__getcm__,__getitem__,__getslice__,__getsm__,__gt__,__i__,__iadd__,__iand__,__idiv__,__ijsmod__,__ilshift__,__imatmul__,__imod__,__imul__,__in__,__init__,__ior__,__ipow__,
 __irshift__,__isub__,__ixor__,__jsUsePyNext__,__jsmod__,__k__,__kwargtrans__,__le__,__lshift__,__lt__,__matmul__,__mergefields__,__mergekwargtrans__,__mod__,__mul__,__ne__,__neg__,__nest__,__or__,__pow__,__pragma__,__proxy__,__pyUseJsNext__,__rshift__,__setitem__,__setproperty__,__setslice__,__sort__,__specialattrib__,__sub__,__super__,__t__,__terminal__,__truediv__,__withblock__,__xor__,abs,all,any,assert,bool,bytearray,bytes,callable,chr,copy,deepcopy,delattr,dict,dir,divmod,enumerate,filter,float,
 getattr,hasattr,input,int,isinstance,issubclass,len,list,map,max,min,object,ord,pow,print,property,py_TypeError,py_iter,py_metatype,py_next,py_reversed,py_typeof,range,repr,round,set,setattr,sorted,str,sum,tuple,zip}from"./org.transcrypt.__runtime__.js";import{fabric}from"./com.fabricjs.js";var __name__="__main__";export var orthoWidth=1E3;export var orthoHeight=750;export var fieldHeight=650;var __left0__=tuple([13,27,32]);export var enter=__left0__[0];export var esc=__left0__[1];export var space=
-__left0__[2];window.onkeydown=function __lambda__(event){return event.keyCode!=space};export var Attribute=__class__("Attribute",[object],{__module__:__name__,get __init__(){return __get__(this,function(self,game){self.game=game;self.game.attributes.append(self);self.install();self.reset()})},get reset(){return __get__(this,function(self){self.commit()})},get predict(){return __get__(this,function(self){})},get interact(){return __get__(this,function(self){})},get commit(){return __get__(this,function(self){})}});
-export var Sprite=__class__("Sprite",[Attribute],{__module__:__name__,get __init__(){return __get__(this,function(self,game,width,height){self.width=width;self.height=height;Attribute.__init__(self,game)})},get install(){return __get__(this,function(self){var red=0;var green=255;var blue=0;var color="rbg({},{},{})".format(red,green,blue);self.image=new fabric.Rect(dict({"width":self.game.scaleX(self.width),"height":self.game.scaleY(self.height),"originX":"center","originY":"center","fill":"white"}))})},
-get reset(){return __get__(this,function(self,vX,vY,x,y){if(typeof vX=="undefined"||vX!=null&&vX.hasOwnProperty("__kwargtrans__"))var vX=0;if(typeof vY=="undefined"||vY!=null&&vY.hasOwnProperty("__kwargtrans__"))var vY=0;if(typeof x=="undefined"||x!=null&&x.hasOwnProperty("__kwargtrans__"))var x=0;if(typeof y=="undefined"||y!=null&&y.hasOwnProperty("__kwargtrans__"))var y=0;if(arguments.length){var __ilastarg0__=arguments.length-1;if(arguments[__ilastarg0__]&&arguments[__ilastarg0__].hasOwnProperty("__kwargtrans__")){var __allkwargs0__=
-arguments[__ilastarg0__--];for(var __attrib0__ in __allkwargs0__)switch(__attrib0__){case "self":var self=__allkwargs0__[__attrib0__];break;case "vX":var vX=__allkwargs0__[__attrib0__];break;case "vY":var vY=__allkwargs0__[__attrib0__];break;case "x":var x=__allkwargs0__[__attrib0__];break;case "y":var y=__allkwargs0__[__attrib0__];break}}}else;self.vX=vX;self.vY=vY;self.x=x;self.y=y;Attribute.reset(self)})},get predict(){return __get__(this,function(self){self.x+=self.vX*self.game.deltaT;self.y+=
-self.vY*self.game.deltaT})},get commit(){return __get__(this,function(self){self.image.left=self.game.orthoX(self.x);self.image.top=self.game.orthoY(self.y)})},get draw(){return __get__(this,function(self){self.game.canvas.add(self.image)})}});export var Square=__class__("Square",[Sprite],{__module__:__name__,get __init__(){return __get__(this,function(self,game,index){self.index=index;Sprite.__init__(self,game,self.width,self.height)})},get set(){return __get__(this,function(self){Sprite.reset(self,
-__kwargtrans__({x:orthoWidth*Math.random(),y:orthoHeight*Math.random()}))})}});var __left0__=50;Square.width=__left0__;Square.height=__left0__;export var Paddle=__class__("Paddle",[Sprite],{__module__:__name__,margin:60,width:50,height:50,speed:400,get __init__(){return __get__(this,function(self,game,index){self.index=index;Sprite.__init__(self,game,self.width,self.height)})},get reset(){return __get__(this,function(self){Sprite.reset(self,__kwargtrans__({x:-orthoWidth/2+self.width+(orthoWidth-self.width)*
-Math.random(),y:-orthoHeight/2+self.height+(orthoHeight-self.height)*Math.random()}))})},get predict(){return __get__(this,function(self){self.vY=0;if(self.index)if(self.game.keyCode==ord("K"))self.vY=self.speed;else{if(self.game.keyCode==ord("M"))self.vY=-self.speed}else if(self.game.keyCode==ord("A"))self.vY=self.speed;else if(self.game.keyCode==ord("Z"))self.vY=-self.speed;Sprite.predict(self)})},get interact(){return __get__(this,function(self){self.y=Math.max(Math.floor(self.height/2)-Math.floor(fieldHeight/
-2),Math.min(self.y,Math.floor(fieldHeight/2)-Math.floor(self.height/2)));if(self.y-Math.floor(self.height/2)<self.game.ball.y&&self.game.ball.y<self.y+Math.floor(self.height/2)&&(self.index==0&&self.game.ball.x<self.x||self.index==1&&self.game.ball.x>self.x)){self.game.ball.x=self.x;self.game.ball.vX=-self.game.ball.vX;self.game.ball.speedUp(self)}})}});export var Ball=__class__("Ball",[Sprite],{__module__:__name__,side:8,speed:300,get __init__(){return __get__(this,function(self,game){Sprite.__init__(self,
-game,self.side,self.side)})},get reset(){return __get__(this,function(self){var angle=self.game.serviceIndex*Math.PI+(Math.random()>.5?1:-1)*Math.random()*Math.atan(fieldHeight/orthoWidth);Sprite.reset(self,__kwargtrans__({vX:self.speed*Math.cos(angle),vY:self.speed*Math.sin(angle)}))})},get predict(){return __get__(this,function(self){Sprite.predict(self);if(self.x<Math.floor(-orthoWidth/2))self.game.scored(1);else if(self.x>Math.floor(orthoWidth/2))self.game.scored(0);if(self.y>Math.floor(fieldHeight/
-2)){self.y=Math.floor(fieldHeight/2);self.vY=-self.vY}else if(self.y<Math.floor(-fieldHeight/2)){self.y=Math.floor(-fieldHeight/2);self.vY=-self.vY}})},get speedUp(){return __get__(this,function(self,bat){var factor=1+.15*Math.pow(1-Math.abs(self.y-bat.y)/Math.floor(bat.height/2),2);if(Math.abs(self.vX)<3*self.speed){self.vX*=factor;self.vY*=factor}})}});export var Scoreboard=__class__("Scoreboard",[Attribute],{__module__:__name__,nameShift:75,hintShift:25,get install(){return __get__(this,function(self){self.playerLabels=
-function(){var __accu0__=[];for(var [py_name,position]of tuple([tuple(["AZ keys:",-7/16]),tuple(["KM keys:",1/16])]))__accu0__.append(new fabric.Text("Player {}".format(py_name),dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(self.game.canvas.width/30),"left":self.game.orthoX(position*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.nameShift)})));return __accu0__}();self.hintLabel=new fabric.Text("[spacebar] starts game, [enter] resets score",dict({"fill":"white",
-"fontFamily":"arial","fontSize":"{}".format(self.game.canvas.width/70),"left":self.game.orthoX(-7/16*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.hintShift)}));self.image=new fabric.Line([self.game.orthoX(Math.floor(-orthoWidth/2)),self.game.orthoY(Math.floor(fieldHeight/2)),self.game.orthoX(Math.floor(orthoWidth/2)),self.game.orthoY(Math.floor(fieldHeight/2))],dict({"stroke":"white"}))})},get increment(){return __get__(this,function(self,playerIndex){self.scores[playerIndex]++})},
-get reset(){return __get__(this,function(self){self.scores=[0,0];Attribute.reset(self)})},get commit(){return __get__(this,function(self){self.scoreLabels=function(){var __accu0__=[];for(var [score,position]of zip(self.scores,tuple([-2/16,6/16])))__accu0__.append(new fabric.Text("{}".format(score),dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(self.game.canvas.width/30),"left":self.game.orthoX(position*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.nameShift)})));
-return __accu0__}()})},get draw(){return __get__(this,function(self){for(var [playerLabel,scoreLabel]of zip(self.playerLabels,self.scoreLabels)){self.game.canvas.add(playerLabel);self.game.canvas.add(scoreLabel);self.game.canvas.add(self.hintLabel)}self.game.canvas.add(self.image)})}});export var Experiment=__class__("Experiment",[object],{__module__:__name__,get __init__(){return __get__(this,function(self){self.keyCode=null;self.pause=true;self.canvasFrame=document.getElementById("canvas_frame");
-self.canvas=new fabric.Canvas("canvas",dict({"backgroundColor":"black","originX":"center","originY":"center"}));self.canvas.onWindowDraw=self.draw;self.canvas.lineWidth=2;self.canvas.clear();var set_size=6;self.attributes=[];var squares=function(){var __accu0__=[];for(var index=0;index<set_size;index++)__accu0__.append(Square(self,index));return __accu0__}();self.squares=function(){var __accu0__=[];for(var square of squares)__accu0__.append(Square.set(square));return __accu0__}();window.setInterval(self.py_update,
-10);window.setInterval(self.draw,20);window.addEventListener("keydown",self.keydown);window.addEventListener("keyup",self.keyup);self.buttons=[];for(var key of tuple(["F","J","space"])){var button=document.getElementById(key);button.addEventListener("mousedown",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));button.addEventListener("touchstart",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));button.addEventListener("mouseup",
-function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.addEventListener("touchend",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.style.cursor="pointer";button.style.userSelect="none";self.buttons.append(button)}self.time=+new Date})},get mouseOrTouch(){return __get__(this,function(self,key,down){if(down)if(key=="space")self.keyCode=space;else if(key=="enter")self.keyCode=enter;else self.keyCode=
-ord(key);else self.keyCode=null})},get py_update(){return __get__(this,function(self){var oldTime=self.time;self.time=+new Date;self.deltaT=(self.time-oldTime)/1E3;if(self.pause){if(self.keyCode==space)self.pause=false}else{for(var attribute of self.attributes)attribute.predict();for(var attribute of self.attributes)attribute.interact();for(var attribute of self.attributes)attribute.commit()}})},get commit(){return __get__(this,function(self){for(var attribute of self.attributes)attribute.commit()})},
-get draw(){return __get__(this,function(self){self.canvas.clear();for(var attribute of self.attributes)attribute.draw()})},get keydown(){return __get__(this,function(self,event){self.keyCode=event.keyCode})},get keyup(){return __get__(this,function(self,event){self.keyCode=null})}});export var Game=__class__("Game",[object],{__module__:__name__,get __init__(){return __get__(this,function(self){self.serviceIndex=Math.random()>.5?1:0;self.pause=true;self.keyCode=null;self.textFrame=document.getElementById("text_frame");
-self.canvasFrame=document.getElementById("canvas_frame");self.buttonsFrame=document.getElementById("buttons_frame");self.canvas=new fabric.Canvas("canvas",dict({"backgroundColor":"grey","originX":"center","originY":"center"}));self.canvas.onWindowDraw=self.draw;self.canvas.lineWidth=2;self.canvas.clear();self.set_size=6;self.attributes=[];self.paddles=function(){var __accu0__=[];for(var index=0;index<self.set_size;index++)__accu0__.append(Paddle(self,index));return __accu0__}();self.ball=Ball(self);
-window.setInterval(self.py_update,10);window.setInterval(self.draw,20);window.addEventListener("keydown",self.keydown);window.addEventListener("keyup",self.keyup);self.buttons=[];for(var key of tuple(["A","Z","K","M","space","enter"])){var button=document.getElementById(key);button.addEventListener("mousedown",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));button.addEventListener("touchstart",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,
-true)}}(key));button.addEventListener("mouseup",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.addEventListener("touchend",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.style.cursor="pointer";button.style.userSelect="none";self.buttons.append(button)}self.time=+new Date;self.start_exp_timer=self.time;self.target_presented=bool;self.isi_presented=bool;self.all_presented=bool;self.trial_set=
-bool;self.target_color=[];window.onresize=self.resize;self.resize()})},get install(){return __get__(this,function(self){for(var attribute of self.attributes)attribute.install()})},get mouseOrTouch(){return __get__(this,function(self,key,down){if(down)if(key=="space")self.keyCode=space;else if(key=="enter")self.keyCode=enter;else self.keyCode=ord(key);else self.keyCode=null})},get py_update(){return __get__(this,function(self){var oldTime=self.time;self.time=+new Date;self.deltaT=(self.time-oldTime)/
-1E3;self.update_squares();if(self.pause)if(self.keyCode==space)self.pause=false;else{if(self.keyCode==enter)self.scoreboard.reset()}else{for(var attribute of self.attributes)attribute.predict();for(var attribute of self.attributes)attribute.interact();for(var attribute of self.attributes)attribute.commit()}})},get update_squares(){return __get__(this,function(self){self.delta_exp_timer=self.time-self.start_exp_timer;if(self.delta_exp_timer<=1E3)if(self.trial_set!=true){for(var paddle of self.paddles){paddle.reset();
-var red=255*Math.random();var green=255*Math.random();var blue=255*Math.random();var color="rgb({},{},{})".format(red,green,blue);paddle.image.fill=color;if(paddle==self.paddles[0])self.target_color=paddle.image.fill}self.trial_set=true}if(1E3<self.delta_exp_timer&&self.delta_exp_timer<=1250)for(var paddle of self.paddles)if(paddle.image.fill!=self.canvas.backgroundColor)paddle.image.fill=self.canvas.backgroundColor;if(1250<self.delta_exp_timer&&self.delta_exp_timer<=2E3)if(self.target_presented!=
-true){for(var paddle of self.paddles)if(paddle.index>0)paddle.image.fill=self.canvas.backgroundColor;else paddle.image.fill=self.target_color;self.target_presented=true}if(2E3<self.delta_exp_timer&&self.delta_exp_timer<=2500)for(var paddle of self.paddles)if(paddle.image.fill!=self.canvas.backgroundColor)paddle.image.fill=self.canvas.backgroundColor;if(2500<self.delta_exp_timer){self.start_exp_timer=self.time;self.trial_set=false;self.target_presented=false;self.isi_presented=false;self.all_presented=
-false}})},get scored(){return __get__(this,function(self,playerIndex){self.scoreboard.increment(playerIndex);self.serviceIndex=1-playerIndex;self.ball.reset();self.pause=true})},get commit(){return __get__(this,function(self){for(var attribute of self.attributes)attribute.commit()})},get draw(){return __get__(this,function(self){self.canvas.clear();for(var attribute of self.attributes)attribute.draw()})},get resize(){return __get__(this,function(self){self.pageWidth=window.innerWidth;self.pageHeight=
-window.innerHeight;self.textTop=0;if(self.pageHeight>1.2*self.pageWidth){self.canvasWidth=self.pageWidth;self.canvasTop=self.textTop+300}else{self.canvasWidth=.6*self.pageWidth;self.canvasTop=self.textTop+200}self.canvasLeft=.5*(self.pageWidth-self.canvasWidth);self.canvasHeight=.6*self.canvasWidth;self.buttonsTop=self.canvasTop+self.canvasHeight+50;self.buttonsWidth=500;self.textFrame.style.top=self.textTop;self.textFrame.style.left=self.canvasLeft+.05*self.canvasWidth;self.textFrame.style.width=
-.9*self.canvasWidth;self.canvasFrame.style.top=self.canvasTop;self.canvasFrame.style.left=self.canvasLeft;self.canvas.setDimensions(dict({"width":self.canvasWidth,"height":self.canvasHeight}));self.buttonsFrame.style.top=self.buttonsTop;self.buttonsFrame.style.left=.5*(self.pageWidth-self.buttonsWidth);self.buttonsFrame.style.width=self.canvasWidth;self.install();self.commit();self.draw()})},get scaleX(){return __get__(this,function(self,x){return x*(self.canvas.width/orthoWidth)})},get scaleY(){return __get__(this,
-function(self,y){return y*(self.canvas.height/orthoHeight)})},get orthoX(){return __get__(this,function(self,x){return self.scaleX(x+Math.floor(orthoWidth/2))})},get orthoY(){return __get__(this,function(self,y){return self.scaleY(orthoHeight-Math.floor(fieldHeight/2)-y)})},get keydown(){return __get__(this,function(self,event){self.keyCode=event.keyCode})},get keyup(){return __get__(this,function(self,event){self.keyCode=null})}});export var game=Game();
+__left0__[2];var __left0__=tuple([70,74]);export var sameKey=__left0__[0];export var differentKey=__left0__[1];export var phaseDurations=[1E3,250,750,500];export var trialsPerBatch=10;export var trialsPerBlock=50;export var maxServerErrors=3;export var maxSetSize=8;export var paletteRetry=2E3;export var trialsUrl="/trials";export var binaryUploads=!__in__("json",window.location.search);export var batchMagic="KTRB";export var batchVersion=1;export var batchHeaderSize=74;export var recordSize=61;export var sessionsUrl=
+"/sessions/";export var cellSize=50;export var batchedSprites=__in__("batched",window.location.search);export var makeSessionId=function(){var characters="abcdefghijklmnopqrstuvwxyz0123456789";return"".join(function(){var __accu0__=[];for(var index=0;index<16;index++)__accu0__.append(characters[Math.floor(Math.random()*len(characters))]);return __accu0__}())};window.onkeydown=function __lambda__(event){return event.keyCode!=space};export var Pool=__class__("Pool",[object],{__module__:__name__,get __init__(){return __get__(this,
+function(self){self.slots=[];self.allocations=0;self.allocationRate=0;self.sampleTime=null;self.sampleAllocations=0})},get register(){return __get__(this,function(self,owner){owner.poolIndex=len(self.slots);self.slots.append(dict({}))})},get reuse(){return __get__(this,function(self,owner,py_name,options){var slot=self.slots[owner.poolIndex];if(__in__(py_name,slot)){slot[py_name].set(options);return slot[py_name]}return null})},get keep(){return __get__(this,function(self,owner,py_name,image){self.slots[owner.poolIndex][py_name]=
+image;self.allocations++;return image})},get rect(){return __get__(this,function(self,owner,py_name,options){return self.reuse(owner,py_name,options)||self.keep(owner,py_name,new fabric.Rect(options))})},get text(){return __get__(this,function(self,owner,py_name,content,options){return self.reuse(owner,py_name,options)||self.keep(owner,py_name,new fabric.Text(content,options))})},get line(){return __get__(this,function(self,owner,py_name,options){return self.reuse(owner,py_name,options)||self.keep(owner,
+py_name,new fabric.Line([options["x1"],options["y1"],options["x2"],options["y2"]],options))})},get sample(){return __get__(this,function(self,time){if(self.sampleTime===null)self.sampleTime=time;else if(time-self.sampleTime>=1E3){self.allocationRate=(self.allocations-self.sampleAllocations)*1E3/(time-self.sampleTime);self.sampleTime=time;self.sampleAllocations=self.allocations}})}});export var Grid=__class__("Grid",[object],{__module__:__name__,get __init__(){return __get__(this,function(self,cellSize){self.cellSize=
+cellSize;self.columns=Math.ceil(orthoWidth/cellSize);self.rows=Math.ceil(orthoHeight/cellSize);self.heads=function(){var __accu0__=[];for(var cell=0;cell<self.columns*self.rows;cell++)__accu0__.append(-1);return __accu0__}();self.py_next=[];self.filled=[];self.filledCount=0;self.sprites=[];self.found=[]})},get column(){return __get__(this,function(self,x){return Math.max(0,Math.min(self.columns-1,Math.floor((x+orthoWidth/2)/self.cellSize)))})},get row(){return __get__(this,function(self,y){return Math.max(0,
+Math.min(self.rows-1,Math.floor((y+orthoHeight/2)/self.cellSize)))})},get rebuild(){return __get__(this,function(self,sprites){for(var index=0;index<self.filledCount;index++)self.heads[self.filled[index]]=-1;self.filledCount=0;while(len(self.py_next)<len(sprites))self.py_next.append(-1);self.sprites=sprites;for(var index=0;index<len(sprites);index++){var cell=self.row(sprites[index].y)*self.columns+self.column(sprites[index].x);if(self.heads[cell]<0){if(self.filledCount<len(self.filled))self.filled[self.filledCount]=
+cell;else self.filled.append(cell);self.filledCount++}self.py_next[index]=self.heads[cell];self.heads[cell]=index}})},get near(){return __get__(this,function(self,sprite){var column=self.column(sprite.x);var row=self.row(sprite.y);var count=0;for(var neighbourRow=Math.max(0,row-1);neighbourRow<Math.min(self.rows,row+2);neighbourRow++)for(var neighbourColumn=Math.max(0,column-1);neighbourColumn<Math.min(self.columns,column+2);neighbourColumn++){var index=self.heads[neighbourRow*self.columns+neighbourColumn];
+while(index>=0){if(self.sprites[index]!==sprite){if(count<len(self.found))self.found[count]=self.sprites[index];else self.found.append(self.sprites[index]);count++}var index=self.py_next[index]}}return count})}});export var Attribute=__class__("Attribute",[object],{__module__:__name__,get __init__(){return __get__(this,function(self,game){self.game=game;self.game.attributes.append(self);self.game.pool.register(self);self.install();self.reset()})},get reset(){return __get__(this,function(self){self.commit()})},
+get predict(){return __get__(this,function(self){})},get interact(){return __get__(this,function(self){})},get commit(){return __get__(this,function(self){})}});export var Sprite=__class__("Sprite",[Attribute],{__module__:__name__,get __init__(){return __get__(this,function(self,game,width,height){self.width=width;self.height=height;game.sprites.append(self);Attribute.__init__(self,game)})},get install(){return __get__(this,function(self){self.image=self.game.pool.rect(self,"image",dict({"width":self.game.scaleX(self.width),
+"height":self.game.scaleY(self.height),"originX":"center","originY":"center","fill":"white"}))})},get reset(){return __get__(this,function(self,vX,vY,x,y){if(typeof vX=="undefined"||vX!=null&&vX.hasOwnProperty("__kwargtrans__"))var vX=0;if(typeof vY=="undefined"||vY!=null&&vY.hasOwnProperty("__kwargtrans__"))var vY=0;if(typeof x=="undefined"||x!=null&&x.hasOwnProperty("__kwargtrans__"))var x=0;if(typeof y=="undefined"||y!=null&&y.hasOwnProperty("__kwargtrans__"))var y=0;if(arguments.length){var __ilastarg0__=
+arguments.length-1;if(arguments[__ilastarg0__]&&arguments[__ilastarg0__].hasOwnProperty("__kwargtrans__")){var __allkwargs0__=arguments[__ilastarg0__--];for(var __attrib0__ in __allkwargs0__)switch(__attrib0__){case "self":var self=__allkwargs0__[__attrib0__];break;case "vX":var vX=__allkwargs0__[__attrib0__];break;case "vY":var vY=__allkwargs0__[__attrib0__];break;case "x":var x=__allkwargs0__[__attrib0__];break;case "y":var y=__allkwargs0__[__attrib0__];break}}}else;self.vX=vX;self.vY=vY;self.x=
+x;self.y=y;Attribute.reset(self)})},get predict(){return __get__(this,function(self){self.x+=self.vX*self.game.deltaT;self.y+=self.vY*self.game.deltaT})},get commit(){return __get__(this,function(self){self.image.left=self.game.orthoX(self.x);self.image.top=self.game.orthoY(self.y)})},get draw(){return __get__(this,function(self){self.game.canvas.add(self.image)})}});export var Square=__class__("Square",[Sprite],{__module__:__name__,get __init__(){return __get__(this,function(self,game,index){self.index=
+index;Sprite.__init__(self,game,self.width,self.height)})},get set(){return __get__(this,function(self){Sprite.reset(self,__kwargtrans__({x:orthoWidth*Math.random(),y:orthoHeight*Math.random()}))})}});var __left0__=50;Square.width=__left0__;Square.height=__left0__;export var Paddle=__class__("Paddle",[Sprite],{__module__:__name__,margin:60,width:50,height:50,speed:400,get __init__(){return __get__(this,function(self,game,index){self.index=index;Sprite.__init__(self,game,self.width,self.height)})},
+get reset(){return __get__(this,function(self){Sprite.reset(self,__kwargtrans__({x:-orthoWidth/2+self.width+(orthoWidth-self.width)*Math.random(),y:-orthoHeight/2+self.height+(orthoHeight-self.height)*Math.random()}))})},get predict(){return __get__(this,function(self){self.steer();Sprite.predict(self)})},get steer(){return __get__(this,function(self){self.vY=0;if(self.index)if(self.game.keyCode==ord("K"))self.vY=self.speed;else{if(self.game.keyCode==ord("M"))self.vY=-self.speed}else if(self.game.keyCode==
+ord("A"))self.vY=self.speed;else if(self.game.keyCode==ord("Z"))self.vY=-self.speed})},get interact(){return __get__(this,function(self){self.y=Math.max(Math.floor(self.height/2)-Math.floor(fieldHeight/2),Math.min(self.y,Math.floor(fieldHeight/2)-Math.floor(self.height/2)));self.hit()})},get hit(){return __get__(this,function(self){for(var index=0;index<self.game.grid.near(self);index++){var ball=self.game.grid.found[index];if(isinstance(ball,Ball)&&(self.y-Math.floor(self.height/2)<ball.y&&ball.y<
+self.y+Math.floor(self.height/2))&&(self.index==0&&ball.x<self.x||self.index==1&&ball.x>self.x)){ball.x=self.x;ball.vX=-ball.vX;ball.speedUp(self)}}})}});export var SpriteArrays=__class__("SpriteArrays",[object],{__module__:__name__,get __init__(){return __get__(this,function(self,capacity){self.count=0;self.x=new Float64Array(capacity);self.y=new Float64Array(capacity);self.vX=new Float64Array(capacity);self.vY=new Float64Array(capacity);self.halfHeight=new Float64Array(capacity);self.left=new Float64Array(capacity);
+self.top=new Float64Array(capacity);self.images=[]})},get allocate(){return __get__(this,function(self,sprite){var slot=self.count;self.count++;self.halfHeight[slot]=Math.floor(sprite.height/2);self.images.append(null);return slot})},get integrate(){return __get__(this,function(self,deltaT){var __left0__=tuple([self.x,self.y,self.vX,self.vY]);var x=__left0__[0];var y=__left0__[1];var vX=__left0__[2];var vY=__left0__[3];for(var slot=0;slot<self.count;slot++){x[slot]+=vX[slot]*deltaT;y[slot]+=vY[slot]*
+deltaT}})},get clamp(){return __get__(this,function(self){var __left0__=tuple([self.y,self.halfHeight]);var y=__left0__[0];var halfHeight=__left0__[1];for(var slot=0;slot<self.count;slot++)y[slot]=Math.max(halfHeight[slot]-Math.floor(fieldHeight/2),Math.min(y[slot],Math.floor(fieldHeight/2)-halfHeight[slot]))})},get project(){return __get__(this,function(self){for(var slot=0;slot<self.count;slot++){self.left[slot]=self.x[slot]+Math.floor(orthoWidth/2);self.top[slot]=orthoHeight-Math.floor(fieldHeight/
+2)-self.y[slot]}self.place()})},get place(){return __get__(this,function(self){for(var slot=0;slot<self.count;slot++){self.images[slot].left=self.left[slot];self.images[slot].top=self.top[slot]}})}});export var ArrayPaddle=__class__("ArrayPaddle",[Paddle],{__module__:__name__,get __init__(){return __get__(this,function(self,game,index){self.store=game.store;self.slot=self.store.allocate(self);Paddle.__init__(self,game,index)})},get install(){return __get__(this,function(self){Paddle.install(self);
+self.store.images[self.slot]=self.image})},get predict(){return __get__(this,function(self){self.steer()})},get interact(){return __get__(this,function(self){self.hit()})},get commit(){return __get__(this,function(self){})},get getX(){return __get__(this,function(self){return self.store.x[self.slot]})},get setX(){return __get__(this,function(self,x){self.store.x[self.slot]=x})},get getY(){return __get__(this,function(self){return self.store.y[self.slot]})},get setY(){return __get__(this,function(self,
+y){self.store.y[self.slot]=y})},get getVX(){return __get__(this,function(self){return self.store.vX[self.slot]})},get setVX(){return __get__(this,function(self,vX){self.store.vX[self.slot]=vX})},get getVY(){return __get__(this,function(self){return self.store.vY[self.slot]})},get setVY(){return __get__(this,function(self,vY){self.store.vY[self.slot]=vY})}});Object.defineProperty(ArrayPaddle,"x",property.call(ArrayPaddle,ArrayPaddle.getX,ArrayPaddle.setX));Object.defineProperty(ArrayPaddle,"y",property.call(ArrayPaddle,
+ArrayPaddle.getY,ArrayPaddle.setY));Object.defineProperty(ArrayPaddle,"vX",property.call(ArrayPaddle,ArrayPaddle.getVX,ArrayPaddle.setVX));Object.defineProperty(ArrayPaddle,"vY",property.call(ArrayPaddle,ArrayPaddle.getVY,ArrayPaddle.setVY));export var Ball=__class__("Ball",[Sprite],{__module__:__name__,side:8,speed:300,get __init__(){return __get__(this,function(self,game){Sprite.__init__(self,game,self.side,self.side)})},get reset(){return __get__(this,function(self){var angle=self.game.serviceIndex*
+Math.PI+(Math.random()>.5?1:-1)*Math.random()*Math.atan(fieldHeight/orthoWidth);Sprite.reset(self,__kwargtrans__({vX:self.speed*Math.cos(angle),vY:self.speed*Math.sin(angle)}))})},get predict(){return __get__(this,function(self){Sprite.predict(self);if(self.x<Math.floor(-orthoWidth/2))self.game.scored(1);else if(self.x>Math.floor(orthoWidth/2))self.game.scored(0);if(self.y>Math.floor(fieldHeight/2)){self.y=Math.floor(fieldHeight/2);self.vY=-self.vY}else if(self.y<Math.floor(-fieldHeight/2)){self.y=
+Math.floor(-fieldHeight/2);self.vY=-self.vY}})},get speedUp(){return __get__(this,function(self,bat){var factor=1+.15*Math.pow(1-Math.abs(self.y-bat.y)/Math.floor(bat.height/2),2);if(Math.abs(self.vX)<3*self.speed){self.vX*=factor;self.vY*=factor}})}});export var Scoreboard=__class__("Scoreboard",[Attribute],{__module__:__name__,nameShift:75,hintShift:25,get install(){return __get__(this,function(self){self.playerLabels=function(){var __accu0__=[];for(var [py_name,position]of tuple([tuple(["AZ keys:",
+-7/16]),tuple(["KM keys:",1/16])]))__accu0__.append(self.game.pool.text(self,py_name,"Player {}".format(py_name),dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(orthoWidth/30),"left":self.game.orthoX(position*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.nameShift)})));return __accu0__}();self.hintLabel=self.game.pool.text(self,"hint","[spacebar] starts game, [enter] resets score",dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(orthoWidth/70),
+"left":self.game.orthoX(-7/16*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.hintShift)}));self.scoreLabels=function(){var __accu0__=[];for(var [py_name,position]of tuple([tuple(["score0",-2/16]),tuple(["score1",6/16])]))__accu0__.append(self.game.pool.text(self,py_name,"0",dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(orthoWidth/30),"left":self.game.orthoX(position*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.nameShift)})));return __accu0__}();
+self.image=self.game.pool.line(self,"image",dict({"x1":self.game.orthoX(Math.floor(-orthoWidth/2)),"y1":self.game.orthoY(Math.floor(fieldHeight/2)),"x2":self.game.orthoX(Math.floor(orthoWidth/2)),"y2":self.game.orthoY(Math.floor(fieldHeight/2)),"stroke":"white"}))})},get increment(){return __get__(this,function(self,playerIndex){self.scores[playerIndex]++})},get reset(){return __get__(this,function(self){self.scores=[0,0];Attribute.reset(self)})},get commit(){return __get__(this,function(self){for(var index=
+0;index<len(self.scores);index++){var text=str(self.scores[index]);if(self.scoreLabels[index].text!=text)self.scoreLabels[index].set("text",text)}})},get draw(){return __get__(this,function(self){for(var [playerLabel,scoreLabel]of zip(self.playerLabels,self.scoreLabels)){self.game.canvas.add(playerLabel);self.game.canvas.add(scoreLabel);self.game.canvas.add(self.hintLabel)}self.game.canvas.add(self.image)})}});export var Experiment=__class__("Experiment",[object],{__module__:__name__,get __init__(){return __get__(this,
+function(self){self.keyCode=null;self.pause=true;self.canvasFrame=document.getElementById("canvas_frame");self.canvas=new fabric.Canvas("canvas",dict({"backgroundColor":"black","originX":"center","originY":"center"}));self.canvas.onWindowDraw=self.draw;self.canvas.lineWidth=2;self.canvas.clear();var set_size=6;self.pool=Pool();self.attributes=[];self.sprites=[];var squares=function(){var __accu0__=[];for(var index=0;index<set_size;index++)__accu0__.append(Square(self,index));return __accu0__}();self.squares=
+function(){var __accu0__=[];for(var square of squares)__accu0__.append(Square.set(square));return __accu0__}();window.setInterval(self.py_update,10);window.setInterval(self.draw,20);window.addEventListener("keydown",self.keydown);window.addEventListener("keyup",self.keyup);self.buttons=[];for(var key of tuple(["F","J","space"])){var button=document.getElementById(key);button.addEventListener("mousedown",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));
+button.addEventListener("touchstart",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));button.addEventListener("mouseup",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.addEventListener("touchend",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.style.cursor="pointer";button.style.userSelect="none";self.buttons.append(button)}self.time=
++new Date})},get mouseOrTouch(){return __get__(this,function(self,key,down){if(down)if(key=="space")self.keyCode=space;else if(key=="enter")self.keyCode=enter;else self.keyCode=ord(key);else self.keyCode=null})},get py_update(){return __get__(this,function(self){var oldTime=self.time;self.time=+new Date;self.deltaT=(self.time-oldTime)/1E3;self.pool.sample(self.time);if(self.pause){if(self.keyCode==space)self.pause=false}else{for(var attribute of self.attributes)attribute.predict();for(var attribute of self.attributes)attribute.interact();
+for(var attribute of self.attributes)attribute.commit()}})},get commit(){return __get__(this,function(self){for(var attribute of self.attributes)attribute.commit()})},get draw(){return __get__(this,function(self){self.canvas.clear();for(var attribute of self.attributes)attribute.draw()})},get keydown(){return __get__(this,function(self,event){self.keyCode=event.keyCode})},get keyup(){return __get__(this,function(self,event){self.keyCode=null})}});export var Game=__class__("Game",[object],{__module__:__name__,
+get __init__(){return __get__(this,function(self){self.serviceIndex=Math.random()>.5?1:0;self.pause=true;self.keyCode=null;self.textFrame=document.getElementById("text_frame");self.canvasFrame=document.getElementById("canvas_frame");self.buttonsFrame=document.getElementById("buttons_frame");self.canvas=new fabric.Canvas("canvas",dict({"backgroundColor":"grey","originX":"center","originY":"center"}));self.canvas.onWindowDraw=self.draw;self.canvas.lineWidth=2;self.canvas.clear();self.set_size=6;self.nextSetSize=
+self.set_size;self.pool=Pool();self.attributes=[];self.sprites=[];self.grid=Grid(cellSize);self.store=batchedSprites?SpriteArrays(maxSetSize):null;var paddleClass=batchedSprites?ArrayPaddle:Paddle;self.paddles=function(){var __accu0__=[];for(var index=0;index<maxSetSize;index++)__accu0__.append(paddleClass(self,index));return __accu0__}();self.ball=Ball(self);self.scoreboard=null;self.session=window.sessionStorage.getItem("session");if(self.session===null){self.session=makeSessionId();window.sessionStorage.setItem("session",
+self.session);window.sessionStorage.setItem("seed",Math.floor(Math.random()*4294967296))}self.seed=int(window.sessionStorage.getItem("seed"));self.trialIndex=0;self.pending=0;self.binary=binaryUploads;self.serverErrors=0;window.fetch(sessionsUrl+self.session+"/resume").then(function __lambda__(response){return response.ok?response.json():null}).then(self.resume);window.fetch(sessionsUrl+self.session+"/staircase").then(function __lambda__(response){return response.ok?response.json():null}).then(self.adapt);
+self.trials=[];self.palette=[];self.paletteOrder=[];self.fetchPalette();self.stimulus=null;self.lastStimulus=null;self.phase=null;self.pendingPhase=null;self.onsets=[null,null,null,null,null];self.response=null;self.rt=null;self.lastFrame=null;self.frameIntervals=[];window.setInterval(self.py_update,10);window.requestAnimationFrame(self.frame);window.addEventListener("keydown",self.keydown);window.addEventListener("keyup",self.keyup);window.addEventListener("pagehide",self.upload);self.buttons=[];
+for(var key of tuple(["A","Z","K","M","space","enter"])){var button=document.getElementById(key);button.addEventListener("mousedown",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));button.addEventListener("touchstart",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));button.addEventListener("mouseup",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));
+button.addEventListener("touchend",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.style.cursor="pointer";button.style.userSelect="none";self.buttons.append(button)}self.time=+new Date;self.start_exp_timer=self.time;self.target_presented=bool;self.isi_presented=bool;self.all_presented=bool;self.trial_set=bool;self.target_color=[];self.resizePending=false;window.onresize=self.requestResize;self.resize()})},get install(){return __get__(this,
+function(self){for(var attribute of self.attributes)attribute.install()})},get mouseOrTouch(){return __get__(this,function(self,key,down){if(down){if(key=="space")self.keyCode=space;else if(key=="enter")self.keyCode=enter;else self.keyCode=ord(key);self.respond(self.keyCode,window.performance.now())}else self.keyCode=null})},get py_update(){return __get__(this,function(self){var oldTime=self.time;self.time=+new Date;self.deltaT=(self.time-oldTime)/1E3;self.pool.sample(self.time);self.update_squares();
+if(self.pause)if(self.keyCode==space)self.pause=false;else{if(self.keyCode==enter&&self.scoreboard)self.scoreboard.reset()}else{for(var attribute of self.attributes)attribute.predict();if(self.store!==null){self.store.integrate(self.deltaT);self.store.clamp()}self.grid.rebuild(self.sprites);for(var attribute of self.attributes)attribute.interact();for(var attribute of self.attributes)attribute.commit()}if(self.store!==null)self.store.project()})},get update_squares(){return __get__(this,function(self){if(!len(self.paletteOrder)){for(var paddle of self.paddles)paddle.image.visible=
+false;self.start_exp_timer=self.time;return}self.delta_exp_timer=self.time-self.start_exp_timer;if(self.delta_exp_timer<=1E3)var phase=0;else if(self.delta_exp_timer<=1250)var phase=1;else if(self.delta_exp_timer<=2E3)var phase=2;else var phase=3;if(phase!=self.phase){self.phase=phase;self.pendingPhase=phase}if(self.delta_exp_timer<=1E3)if(self.trial_set!=true){self.lastStimulus=self.stimulus;self.set_size=self.nextSetSize;self.stimulus=dict({"setSize":self.set_size,"changed":Math.random()<.5});self.sampleColors(self.set_size+
+1);for(var paddle of self.paddles){paddle.reset();paddle.image.visible=paddle.index<self.set_size;paddle.image.fill=self.color(paddle.index);if(paddle==self.paddles[0])self.target_color=paddle.image.fill}self.trial_set=true}if(1E3<self.delta_exp_timer&&self.delta_exp_timer<=1250)for(var paddle of self.paddles)if(paddle.image.fill!=self.canvas.backgroundColor)paddle.image.fill=self.canvas.backgroundColor;if(1250<self.delta_exp_timer&&self.delta_exp_timer<=2E3)if(self.target_presented!=true){for(var paddle of self.paddles)if(paddle.index>
+0)paddle.image.fill=self.canvas.backgroundColor;else if(self.stimulus["changed"])paddle.image.fill=self.color(self.set_size);else paddle.image.fill=self.target_color;self.target_presented=true}if(2E3<self.delta_exp_timer&&self.delta_exp_timer<=2500)for(var paddle of self.paddles)if(paddle.image.fill!=self.canvas.backgroundColor)paddle.image.fill=self.canvas.backgroundColor;if(2500<self.delta_exp_timer){self.start_exp_timer=self.time;self.trial_set=false;self.target_presented=false;self.isi_presented=
+false;self.all_presented=false}})},get fetchPalette(){return __get__(this,function(self){window.fetch(window.paletteUrl).then(function __lambda__(response){return response.ok?response.text():""}).then(self.loadPalette).catch(function __lambda__(error){return self.loadPalette("")})})},get loadPalette(){return __get__(this,function(self,text){var palette=function(){var __accu0__=[];for(var line of text.py_split("\n").__getslice__(1,null,1))if(line)__accu0__.append(line.py_split(",")[0]);return __accu0__}();
+if(len(palette)<=maxSetSize){window.setTimeout(self.fetchPalette,paletteRetry);return}self.palette=palette;self.paletteOrder=function(){var __accu0__=[];for(var index=0;index<len(palette);index++)__accu0__.append(index);return __accu0__}()})},get sampleColors(){return __get__(this,function(self,count){var order=self.paletteOrder;for(var index=0;index<Math.min(count,len(order));index++){var other=index+Math.floor(Math.random()*(len(order)-index));var __left0__=tuple([order[other],order[index]]);order[index]=
+__left0__[0];order[other]=__left0__[1]}})},get color(){return __get__(this,function(self,index){return self.palette[self.paletteOrder[index]]})},get scored(){return __get__(this,function(self,playerIndex){if(self.scoreboard)self.scoreboard.increment(playerIndex);self.serviceIndex=1-playerIndex;self.ball.reset();self.pause=true})},get commit(){return __get__(this,function(self){for(var attribute of self.attributes)attribute.commit()})},get draw(){return __get__(this,function(self){self.canvas.clear();
+for(var attribute of self.attributes)attribute.draw()})},get frame(){return __get__(this,function(self,timestamp){if(self.lastFrame!==null)self.frameIntervals.append(timestamp-self.lastFrame);self.lastFrame=timestamp;self.draw();if(self.pendingPhase!==null){if(self.pendingPhase==0&&self.onsets[0]!==null){self.onsets[4]=timestamp;self.finishTrial()}self.onsets[self.pendingPhase]=timestamp;self.pendingPhase=null}window.requestAnimationFrame(self.frame)})},get respond(){return __get__(this,function(self,
+keyCode,timestamp){if(!__in__(keyCode,tuple([sameKey,differentKey])))return;if(self.response===null&&self.onsets[2]!==null){self.response=keyCode;self.rt=timestamp-self.onsets[2]}})},get finishTrial(){return __get__(this,function(self){var intervals=sorted(self.frameIntervals,__kwargtrans__({key:function __lambda__(interval){return interval}}));var period=len(intervals)?intervals[Math.floor(len(intervals)/2)]:0;var droppedFrames=0;for(var interval of self.frameIntervals)if(interval>1.5*period)droppedFrames+=
+Math.round(interval/period)-1;var changed=self.lastStimulus["changed"];var correct=self.response==differentKey&&changed||self.response==sameKey&&!changed;var trial=dict({"trial":self.trialIndex,"block":Math.floor(self.trialIndex/trialsPerBlock),"seed":self.seed,"setSize":self.lastStimulus["setSize"],"key":self.response!==null?self.response:0,"changed":changed?1:0,"correct":correct?1:0,"rt":self.rt!==null?self.rt:-1,"durations":function(){var __accu0__=[];for(var index=0;index<4;index++)__accu0__.append(self.onsets[index+
+1]-self.onsets[index]);return __accu0__}(),"droppedFrames":Math.min(droppedFrames,65535),"refreshRate":period?1E3/period:0});self.trials.append(trial);if(self.response!==null)self.step(trial);self.trialIndex++;self.onsets=[null,null,null,null,null];self.response=null;self.rt=null;self.frameIntervals=[];if(len(self.trials)>=trialsPerBatch)self.upload()})},get upload(){return __get__(this,function(self){if(!len(self.trials))return;var batch=self.trials;self.trials=[];self.pending++;var binary=self.binary;
+if(binary){var __left0__=tuple(["application/octet-stream",self.encode(batch)]);var contentType=__left0__[0];var body=__left0__[1]}else{var __left0__=tuple(["application/json",window.JSON.stringify(dict({"session":self.session,"pending":self.pending,"trials":batch}))]);var contentType=__left0__[0];var body=__left0__[1]}window.fetch(trialsUrl,dict({"method":"POST","headers":dict({"Content-Type":contentType}),"body":body,"keepalive":true})).then(function __lambda__(response){return self.acknowledge(batch,
+response.status,binary)}).catch(function __lambda__(error){return self.acknowledge(batch,0,binary)})})},get encode(){return __get__(this,function(self,batch){var buffer=new ArrayBuffer(batchHeaderSize+recordSize*len(batch));var view=new DataView(buffer);for(var index=0;index<len(batchMagic);index++)view.setUint8(index,ord(batchMagic[index]));view.setUint8(4,batchVersion);view.setUint16(6,self.pending,true);view.setUint16(8,len(batch),true);for(var index=0;index<len(self.session);index++)view.setUint8(10+
+index,ord(self.session[index]));var offset=batchHeaderSize;for(var trial of batch){view.setUint32(offset,trial["trial"],true);view.setUint16(offset+4,trial["block"],true);view.setUint32(offset+6,trial["seed"],true);view.setUint8(offset+10,trial["setSize"]);view.setUint16(offset+11,trial["key"],true);view.setUint8(offset+13,trial["changed"]);view.setUint8(offset+14,trial["correct"]);view.setFloat64(offset+15,trial["rt"],true);for(var index=0;index<4;index++)view.setFloat64(offset+23+8*index,trial["durations"][index],
+true);view.setUint16(offset+55,trial["droppedFrames"],true);view.setFloat32(offset+57,trial["refreshRate"],true);offset+=recordSize}return buffer})},get step(){return __get__(this,function(self,trial){window.fetch(sessionsUrl+self.session+"/staircase",dict({"method":"POST","headers":dict({"Content-Type":"application/json"}),"body":window.JSON.stringify(dict({"trial":trial["trial"],"setSize":trial["setSize"],"correct":trial["correct"]}))})).then(function __lambda__(response){return response.ok?response.json():
+null}).then(self.adapt).catch(function __lambda__(error){return null})})},get adapt(){return __get__(this,function(self,step){if(step)self.nextSetSize=step["setSize"]})},get acknowledge(){return __get__(this,function(self,batch,status,binary){self.pending--;if(binary&&__in__(status,tuple([400,415]))){self.binary=false;var status=0}if(status>=500){self.serverErrors++;if(self.serverErrors>maxServerErrors){self.serverErrors=0;return}}else if(status)self.serverErrors=0;if(status==0||status>=500){for(var trial of self.trials)batch.append(trial);
+self.trials=batch}})},get resume(){return __get__(this,function(self,progress){if(progress)self.trialIndex+=progress["trial"]})},get requestResize(){return __get__(this,function(self,event){if(typeof event=="undefined"||event!=null&&event.hasOwnProperty("__kwargtrans__"))var event=null;if(!self.resizePending){self.resizePending=true;window.requestAnimationFrame(self.resize)}})},get resize(){return __get__(this,function(self,timestamp){if(typeof timestamp=="undefined"||timestamp!=null&&timestamp.hasOwnProperty("__kwargtrans__"))var timestamp=
+null;self.resizePending=false;self.pageWidth=window.innerWidth;self.pageHeight=window.innerHeight;self.textTop=0;if(self.pageHeight>1.2*self.pageWidth){self.canvasWidth=self.pageWidth;self.canvasTop=self.textTop+300}else{self.canvasWidth=.6*self.pageWidth;self.canvasTop=self.textTop+200}self.canvasLeft=.5*(self.pageWidth-self.canvasWidth);self.canvasHeight=.6*self.canvasWidth;self.buttonsTop=self.canvasTop+self.canvasHeight+50;self.buttonsWidth=500;self.textFrame.style.top=self.textTop;self.textFrame.style.left=
+self.canvasLeft+.05*self.canvasWidth;self.textFrame.style.width=.9*self.canvasWidth;self.canvasFrame.style.top=self.canvasTop;self.canvasFrame.style.left=self.canvasLeft;self.canvas.setDimensions(dict({"width":self.canvasWidth,"height":self.canvasHeight}));self.canvas.setViewportTransform([self.canvasWidth/orthoWidth,0,0,self.canvasHeight/orthoHeight,0,0]);self.buttonsFrame.style.top=self.buttonsTop;self.buttonsFrame.style.left=.5*(self.pageWidth-self.buttonsWidth);self.buttonsFrame.style.width=self.canvasWidth;
+self.canvas.renderAll()})},get scaleX(){return __get__(this,function(self,x){return x})},get scaleY(){return __get__(this,function(self,y){return y})},get orthoX(){return __get__(this,function(self,x){return self.scaleX(x+Math.floor(orthoWidth/2))})},get orthoY(){return __get__(this,function(self,y){return self.scaleY(orthoHeight-Math.floor(fieldHeight/2)-y)})},get keydown(){return __get__(this,function(self,event){self.keyCode=event.keyCode;self.respond(event.keyCode,event.timeStamp<1E12?event.timeStamp:
+window.performance.now())})},get keyup(){return __get__(this,function(self,event){self.keyCode=null})}});export var game=Game();
 
 //# sourceMappingURL=ktask.map
\ No newline at end of file
@@ -0,0 +1,32 @@
+'use strict';import{AssertionError,AttributeError,BaseException,DeprecationWarning,Exception,IndexError,IterableError,KeyError,NotImplementedError,RuntimeWarning,StopIteration,UserWarning,ValueError,Warning,__JsIterator__,__PyIterator__,__Terminal__,__add__,__and__,__call__,__class__,__envir__,__eq__,__floordiv__,__ge__,__get__,__getcm__,__getitem__,__getslice__,__getsm__,__gt__,__i__,__iadd__,__iand__,__idiv__,__ijsmod__,__ilshift__,__imatmul__,__imod__,__imul__,__in__,__init__,__ior__,__ipow__,
+__irshift__,__isub__,__ixor__,__jsUsePyNext__,__jsmod__,__k__,__kwargtrans__,__le__,__lshift__,__lt__,__matmul__,__mergefields__,__mergekwargtrans__,__mod__,__mul__,__ne__,__neg__,__nest__,__or__,__pow__,__pragma__,__proxy__,__pyUseJsNext__,__rshift__,__setitem__,__setproperty__,__setslice__,__sort__,__specialattrib__,__sub__,__super__,__t__,__terminal__,__truediv__,__withblock__,__xor__,abs,all,any,assert,bool,bytearray,bytes,callable,chr,copy,deepcopy,delattr,dict,dir,divmod,enumerate,filter,float,
+getattr,hasattr,input,int,isinstance,issubclass,len,list,map,max,min,object,ord,pow,print,property,py_TypeError,py_iter,py_metatype,py_next,py_reversed,py_typeof,range,repr,round,set,setattr,sorted,str,sum,tuple,zip}from"./org.transcrypt.__runtime__.js";import{fabric}from"./com.fabricjs.js";var __name__="__main__";export var orthoWidth=1E3;export var orthoHeight=750;export var fieldHeight=650;var __left0__=tuple([13,27,32]);export var enter=__left0__[0];export var esc=__left0__[1];export var space=
+__left0__[2];export var timeStep=1/120;export var maxSteps=12;window.onkeydown=function __lambda__(event){return event.keyCode!=space};export var Pool=__class__("Pool",[object],{__module__:__name__,get __init__(){return __get__(this,function(self){self.slots=[];self.allocations=0;self.allocationRate=0;self.sampleTime=null;self.sampleAllocations=0})},get register(){return __get__(this,function(self,owner){owner.poolIndex=len(self.slots);self.slots.append(dict({}))})},get reuse(){return __get__(this,
+function(self,owner,py_name,options){var slot=self.slots[owner.poolIndex];if(__in__(py_name,slot)){slot[py_name].set(options);return slot[py_name]}return null})},get keep(){return __get__(this,function(self,owner,py_name,image){self.slots[owner.poolIndex][py_name]=image;self.allocations++;return image})},get rect(){return __get__(this,function(self,owner,py_name,options){return self.reuse(owner,py_name,options)||self.keep(owner,py_name,new fabric.Rect(options))})},get text(){return __get__(this,function(self,
+owner,py_name,content,options){return self.reuse(owner,py_name,options)||self.keep(owner,py_name,new fabric.Text(content,options))})},get line(){return __get__(this,function(self,owner,py_name,options){return self.reuse(owner,py_name,options)||self.keep(owner,py_name,new fabric.Line([options["x1"],options["y1"],options["x2"],options["y2"]],options))})},get sample(){return __get__(this,function(self,time){if(self.sampleTime===null)self.sampleTime=time;else if(time-self.sampleTime>=1E3){self.allocationRate=
+(self.allocations-self.sampleAllocations)*1E3/(time-self.sampleTime);self.sampleTime=time;self.sampleAllocations=self.allocations}})}});export var Attribute=__class__("Attribute",[object],{__module__:__name__,get __init__(){return __get__(this,function(self,game){self.game=game;self.game.attributes.append(self);self.game.pool.register(self);self.install();self.reset()})},get reset(){return __get__(this,function(self){self.commit()})},get predict(){return __get__(this,function(self){})},get interact(){return __get__(this,
+function(self){})},get commit(){return __get__(this,function(self){})}});export var Sprite=__class__("Sprite",[Attribute],{__module__:__name__,get __init__(){return __get__(this,function(self,game,width,height){self.width=width;self.height=height;Attribute.__init__(self,game)})},get install(){return __get__(this,function(self){self.image=self.game.pool.rect(self,"image",dict({"width":self.game.scaleX(self.width),"height":self.game.scaleY(self.height),"originX":"center","originY":"center","fill":"white"}))})},
+get reset(){return __get__(this,function(self,vX,vY,x,y){if(typeof vX=="undefined"||vX!=null&&vX.hasOwnProperty("__kwargtrans__"))var vX=0;if(typeof vY=="undefined"||vY!=null&&vY.hasOwnProperty("__kwargtrans__"))var vY=0;if(typeof x=="undefined"||x!=null&&x.hasOwnProperty("__kwargtrans__"))var x=0;if(typeof y=="undefined"||y!=null&&y.hasOwnProperty("__kwargtrans__"))var y=0;if(arguments.length){var __ilastarg0__=arguments.length-1;if(arguments[__ilastarg0__]&&arguments[__ilastarg0__].hasOwnProperty("__kwargtrans__")){var __allkwargs0__=
+arguments[__ilastarg0__--];for(var __attrib0__ in __allkwargs0__)switch(__attrib0__){case "self":var self=__allkwargs0__[__attrib0__];break;case "vX":var vX=__allkwargs0__[__attrib0__];break;case "vY":var vY=__allkwargs0__[__attrib0__];break;case "x":var x=__allkwargs0__[__attrib0__];break;case "y":var y=__allkwargs0__[__attrib0__];break}}}else;self.vX=vX;self.vY=vY;self.x=x;self.y=y;self.previousX=x;self.previousY=y;Attribute.reset(self)})},get predict(){return __get__(this,function(self){self.previousX=
+self.x;self.previousY=self.y;self.x+=self.vX*self.game.deltaT;self.y+=self.vY*self.game.deltaT})},get commit(){return __get__(this,function(self){var alpha=self.game.alpha;self.image.left=self.game.orthoX(self.previousX+(self.x-self.previousX)*alpha);self.image.top=self.game.orthoY(self.previousY+(self.y-self.previousY)*alpha)})},get draw(){return __get__(this,function(self){self.game.canvas.add(self.image)})}});export var Paddle=__class__("Paddle",[Sprite],{__module__:__name__,margin:30,width:10,
+height:100,speed:400,get __init__(){return __get__(this,function(self,game,index){self.index=index;Sprite.__init__(self,game,self.width,self.height)})},get reset(){return __get__(this,function(self){Sprite.reset(self,__kwargtrans__({x:self.index?Math.floor(orthoWidth/2)-self.margin:Math.floor(-orthoWidth/2)+self.margin,y:0}))})},get predict(){return __get__(this,function(self){self.vY=0;if(self.index)if(self.game.keyCode==ord("K"))self.vY=self.speed;else{if(self.game.keyCode==ord("M"))self.vY=-self.speed}else if(self.game.keyCode==
+ord("A"))self.vY=self.speed;else if(self.game.keyCode==ord("Z"))self.vY=-self.speed;Sprite.predict(self)})},get interact(){return __get__(this,function(self){self.y=Math.max(Math.floor(self.height/2)-Math.floor(fieldHeight/2),Math.min(self.y,Math.floor(fieldHeight/2)-Math.floor(self.height/2)));var ball=self.game.ball;if(self.index==0&&(ball.previousX>=self.x&&self.x>ball.x)||self.index==1&&(ball.previousX<=self.x&&self.x<ball.x)){var fraction=(self.x-ball.previousX)/(ball.x-ball.previousX);var crossingY=
+ball.previousY+(ball.y-ball.previousY)*fraction;var paddleY=self.previousY+(self.y-self.previousY)*fraction;if(Math.abs(crossingY-paddleY)<Math.floor(self.height/2)){ball.x=2*self.x-ball.x;ball.vX=-ball.vX;ball.speedUp(self)}}})}});export var Ball=__class__("Ball",[Sprite],{__module__:__name__,side:8,speed:300,get __init__(){return __get__(this,function(self,game){Sprite.__init__(self,game,self.side,self.side)})},get reset(){return __get__(this,function(self){var angle=self.game.serviceIndex*Math.PI+
+(Math.random()>.5?1:-1)*Math.random()*Math.atan(fieldHeight/orthoWidth);Sprite.reset(self,__kwargtrans__({vX:self.speed*Math.cos(angle),vY:self.speed*Math.sin(angle)}))})},get predict(){return __get__(this,function(self){Sprite.predict(self);if(self.x<Math.floor(-orthoWidth/2))self.game.scored(1);else if(self.x>Math.floor(orthoWidth/2))self.game.scored(0);if(self.y>Math.floor(fieldHeight/2)){self.y=Math.floor(fieldHeight/2);self.vY=-self.vY}else if(self.y<Math.floor(-fieldHeight/2)){self.y=Math.floor(-fieldHeight/
+2);self.vY=-self.vY}})},get speedUp(){return __get__(this,function(self,bat){var factor=1+.15*Math.pow(1-Math.abs(self.y-bat.y)/Math.floor(bat.height/2),2);if(Math.abs(self.vX)<3*self.speed){self.vX*=factor;self.vY*=factor}})}});export var Scoreboard=__class__("Scoreboard",[Attribute],{__module__:__name__,nameShift:75,hintShift:25,get install(){return __get__(this,function(self){self.playerLabels=function(){var __accu0__=[];for(var [py_name,position]of tuple([tuple(["AZ keys:",-7/16]),tuple(["KM keys:",
+1/16])]))__accu0__.append(self.game.pool.text(self,py_name,"Player {}".format(py_name),dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(orthoWidth/30),"left":self.game.orthoX(position*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.nameShift)})));return __accu0__}();self.hintLabel=self.game.pool.text(self,"hint","[spacebar] starts game, [enter] resets score",dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(orthoWidth/70),"left":self.game.orthoX(-7/
+16*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.hintShift)}));self.scoreLabels=function(){var __accu0__=[];for(var [py_name,position]of tuple([tuple(["score0",-2/16]),tuple(["score1",6/16])]))__accu0__.append(self.game.pool.text(self,py_name,"0",dict({"fill":"white","fontFamily":"arial","fontSize":"{}".format(orthoWidth/30),"left":self.game.orthoX(position*orthoWidth),"top":self.game.orthoY(Math.floor(fieldHeight/2)+self.nameShift)})));return __accu0__}();self.image=self.game.pool.line(self,
+"image",dict({"x1":self.game.orthoX(Math.floor(-orthoWidth/2)),"y1":self.game.orthoY(Math.floor(fieldHeight/2)),"x2":self.game.orthoX(Math.floor(orthoWidth/2)),"y2":self.game.orthoY(Math.floor(fieldHeight/2)),"stroke":"white"}))})},get increment(){return __get__(this,function(self,playerIndex){self.scores[playerIndex]++})},get reset(){return __get__(this,function(self){self.scores=[0,0];Attribute.reset(self)})},get commit(){return __get__(this,function(self){for(var index=0;index<len(self.scores);index++){var text=
+str(self.scores[index]);if(self.scoreLabels[index].text!=text)self.scoreLabels[index].set("text",text)}})},get draw(){return __get__(this,function(self){for(var [playerLabel,scoreLabel]of zip(self.playerLabels,self.scoreLabels)){self.game.canvas.add(playerLabel);self.game.canvas.add(scoreLabel);self.game.canvas.add(self.hintLabel)}self.game.canvas.add(self.image)})}});export var Game=__class__("Game",[object],{__module__:__name__,get __init__(){return __get__(this,function(self){self.serviceIndex=
+Math.random()>.5?1:0;self.pause=true;self.keyCode=null;self.textFrame=document.getElementById("text_frame");self.canvasFrame=document.getElementById("canvas_frame");self.buttonsFrame=document.getElementById("buttons_frame");self.canvas=new fabric.Canvas("canvas",dict({"backgroundColor":"black","originX":"center","originY":"center"}));self.canvas.onWindowDraw=self.draw;self.canvas.lineWidth=2;self.canvas.clear();self.pool=Pool();self.attributes=[];self.accumulator=0;self.alpha=1;self.paddles=function(){var __accu0__=
+[];for(var index=0;index<2;index++)__accu0__.append(Paddle(self,index));return __accu0__}();self.ball=Ball(self);self.scoreboard=Scoreboard(self);window.setInterval(self.py_update,10);window.setInterval(self.draw,20);window.addEventListener("keydown",self.keydown);window.addEventListener("keyup",self.keyup);self.buttons=[];for(var key of tuple(["A","Z","K","M","space","enter"])){var button=document.getElementById(key);button.addEventListener("mousedown",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,
+true)}}(key));button.addEventListener("touchstart",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,true)}}(key));button.addEventListener("mouseup",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.addEventListener("touchend",function __lambda__(aKey){return function __lambda__(){return self.mouseOrTouch(aKey,false)}}(key));button.style.cursor="pointer";button.style.userSelect="none";self.buttons.append(button)}self.time=
++new Date;self.resizePending=false;window.onresize=self.requestResize;self.resize()})},get install(){return __get__(this,function(self){for(var attribute of self.attributes)attribute.install()})},get mouseOrTouch(){return __get__(this,function(self,key,down){if(down)if(key=="space")self.keyCode=space;else if(key=="enter")self.keyCode=enter;else self.keyCode=ord(key);else self.keyCode=null})},get py_update(){return __get__(this,function(self){var oldTime=self.time;self.time=+new Date;self.pool.sample(self.time);
+self.accumulator=Math.min(self.accumulator+(self.time-oldTime)/1E3,maxSteps*timeStep);self.deltaT=timeStep;if(self.pause){self.accumulator=0;if(self.keyCode==space)self.pause=false;else if(self.keyCode==enter)self.scoreboard.reset()}else{while(self.accumulator>=timeStep&&!self.pause){for(var attribute of self.attributes)attribute.predict();for(var attribute of self.attributes)attribute.interact();self.accumulator-=timeStep}self.alpha=self.accumulator/timeStep;for(var attribute of self.attributes)attribute.commit()}})},
+get scored(){return __get__(this,function(self,playerIndex){self.scoreboard.increment(playerIndex);self.serviceIndex=1-playerIndex;for(var paddle of self.paddles)paddle.reset();self.ball.reset();self.pause=true})},get commit(){return __get__(this,function(self){for(var attribute of self.attributes)attribute.commit()})},get draw(){return __get__(this,function(self){self.canvas.clear();for(var attribute of self.attributes)attribute.draw()})},get requestResize(){return __get__(this,function(self,event){if(typeof event==
+"undefined"||event!=null&&event.hasOwnProperty("__kwargtrans__"))var event=null;if(!self.resizePending){self.resizePending=true;window.requestAnimationFrame(self.resize)}})},get resize(){return __get__(this,function(self,timestamp){if(typeof timestamp=="undefined"||timestamp!=null&&timestamp.hasOwnProperty("__kwargtrans__"))var timestamp=null;self.resizePending=false;self.pageWidth=window.innerWidth;self.pageHeight=window.innerHeight;self.textTop=0;if(self.pageHeight>1.2*self.pageWidth){self.canvasWidth=
+self.pageWidth;self.canvasTop=self.textTop+300}else{self.canvasWidth=.6*self.pageWidth;self.canvasTop=self.textTop+200}self.canvasLeft=.5*(self.pageWidth-self.canvasWidth);self.canvasHeight=.6*self.canvasWidth;self.buttonsTop=self.canvasTop+self.canvasHeight+50;self.buttonsWidth=500;self.textFrame.style.top=self.textTop;self.textFrame.style.left=self.canvasLeft+.05*self.canvasWidth;self.textFrame.style.width=.9*self.canvasWidth;self.canvasFrame.style.top=self.canvasTop;self.canvasFrame.style.left=
+self.canvasLeft;self.canvas.setDimensions(dict({"width":self.canvasWidth,"height":self.canvasHeight}));self.canvas.setViewportTransform([self.canvasWidth/orthoWidth,0,0,self.canvasHeight/orthoHeight,0,0]);self.buttonsFrame.style.top=self.buttonsTop;self.buttonsFrame.style.left=.5*(self.pageWidth-self.buttonsWidth);self.buttonsFrame.style.width=self.canvasWidth;self.canvas.renderAll()})},get scaleX(){return __get__(this,function(self,x){return x})},get scaleY(){return __get__(this,function(self,y){return y})},
+get orthoX(){return __get__(this,function(self,x){return self.scaleX(x+Math.floor(orthoWidth/2))})},get orthoY(){return __get__(this,function(self,y){return self.scaleY(orthoHeight-Math.floor(fieldHeight/2)-y)})},get keydown(){return __get__(this,function(self,event){self.keyCode=event.keyCode})},get keyup(){return __get__(this,function(self,event){self.keyCode=null})}});export var game=Game();
+
+//# sourceMappingURL=pong.map
\ No newline at end of file
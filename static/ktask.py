@@ -5,6 +5,10 @@
 #
 # transcrypt -b static/pong.py
 #
+# or, to compile only what changed and refresh the cache busting tables as well,
+#
+# flask build-assets
+#
 # this will create a folder called __target__ with these files:
 # -com.fabric.js
 # -org.transcrypt.__runtime__.js
@@ -19,6 +23,9 @@ from org.transcrypt.stubs.browser import __pragma__, __new__, document, window,
 from com.fabricjs import fabric
 
 __pragma__ ('skip')
+import numpy                    # Only under CPython, e.g. in the headless harness, where typed arrays are NumPy arrays
+Float64Array = numpy.zeros
+from org.transcrypt.stubs.browser import ArrayBuffer, DataView  # Only the harness' stand-ins, browsers have them built in
 __pragma__ ('noskip')
 __pragma__ ('noalias', 'clear')
 
@@ -27,13 +34,133 @@ orthoHeight = 750
 fieldHeight = 650
 
 enter, esc, space = 13, 27, 32
+sameKey, differentKey = 70, 74          # F and J
+
+phaseDurations = [1000, 250, 750, 500]  # Nominal memory display, blank, test display and intertrial durations in ms
+trialsPerBatch = 10                     # Trials are uploaded in batches of this size
+trialsPerBlock = 50
+maxServerErrors = 3                     # Server errors in a row after which a batch is given up rather than sent again
+maxSetSize = 8                          # Squares that exist, the staircase decides how many of them are shown
+paletteRetry = 2000                     # ms to wait before fetching the palette again after a failure
+trialsUrl = '/trials'
+binaryUploads = 'json' not in window.location.search  # ?json uploads trials as JSON from the start
+batchMagic = 'KTRB'                     # Binary batch layout, see trial_store.py
+batchVersion = 1
+batchHeaderSize = 74                    # Magic, version, padding, pending, count, 64 byte session
+recordSize = 61                         # Packed trial record
+sessionsUrl = '/sessions/'
+cellSize = 50                           # Broad phase grid cell, at least the largest distance at which sprites interact
+batchedSprites = 'batched' in window.location.search  # ?batched keeps paddle state in SpriteArrays
+
+def makeSessionId ():   # Random id, lets the server tell participants apart
+    characters = 'abcdefghijklmnopqrstuvwxyz0123456789'
+    return ''.join ([characters [Math.floor (Math.random () * len (characters))] for index in range (16)])
 
 window.onkeydown = lambda event: event.keyCode != space # Prevent scrolldown on spacebar press
 
+class Pool:     # Fabric primitives are kept here and updated in place, rather than reallocated on every install or commit
+    def __init__ (self):
+        self.slots = []                 # One slot of named primitives per attribute
+        self.allocations = 0            # Number of fabric objects ever created through the pool
+        self.allocationRate = 0         # Allocations per second, measured over the last sample
+        self.sampleTime = None
+        self.sampleAllocations = 0
+        
+    def register (self, owner):         # Give an attribute its own slot
+        owner.poolIndex = len (self.slots)
+        self.slots.append ({})
+        
+    def reuse (self, owner, name, options):     # Update an existing primitive in place, None if it still has to be made
+        slot = self.slots [owner.poolIndex]
+        if name in slot:
+            slot [name] .set (options)
+            return slot [name]
+        return None
+        
+    def keep (self, owner, name, image):        # Store a freshly made primitive for later reuse
+        self.slots [owner.poolIndex][name] = image
+        self.allocations += 1
+        return image
+        
+    def rect (self, owner, name, options):
+        return self.reuse (owner, name, options) or self.keep (owner, name, __new__ (fabric.Rect (options)))
+        
+    def text (self, owner, name, content, options):     # Content is only used when the label is first made
+        return self.reuse (owner, name, options) or self.keep (owner, name, __new__ (fabric.Text (content, options)))
+        
+    def line (self, owner, name, options):
+        return self.reuse (owner, name, options) or self.keep (owner, name, __new__ (fabric.Line (
+            [options ['x1'], options ['y1'], options ['x2'], options ['y2']], options
+        )))
+        
+    def sample (self, time):            # Called every update, refreshes allocationRate once a second
+        if self.sampleTime is None:
+            self.sampleTime = time
+        elif time - self.sampleTime >= 1000:
+            self.allocationRate = (self.allocations - self.sampleAllocations) * 1000 / (time - self.sampleTime)
+            self.sampleTime = time
+            self.sampleAllocations = self.allocations
+
+class Grid:     # Uniform grid broad phase, sprites are bucketed by cell each tick so only neighbours need a narrow phase test
+    def __init__ (self, cellSize):
+        self.cellSize = cellSize
+        self.columns = Math.ceil (orthoWidth / cellSize)
+        self.rows = Math.ceil (orthoHeight / cellSize)
+        self.heads = [-1 for cell in range (self.columns * self.rows)]    # First sprite in each cell, -1 if empty
+        self.next = []                  # Next sprite in the same cell, by sprite index, -1 at the end
+        self.filled = []                # Cells that are not empty, so clearing them costs no more than filling did
+        self.filledCount = 0
+        self.sprites = []
+        self.found = []                 # Reused by near, only the first entries it reports are valid
+        
+    def column (self, x):               # Sprites outside the field are kept in the border cells
+        return Math.max (0, Math.min (self.columns - 1, Math.floor ((x + orthoWidth / 2) / self.cellSize)))
+        
+    def row (self, y):
+        return Math.max (0, Math.min (self.rows - 1, Math.floor ((y + orthoHeight / 2) / self.cellSize)))
+        
+    def rebuild (self, sprites):        # Bucket sprites by their current position, O(len (sprites))
+        for index in range (self.filledCount):
+            self.heads [self.filled [index]] = -1
+        self.filledCount = 0
+        
+        while len (self.next) < len (sprites):
+            self.next.append (-1)
+        self.sprites = sprites
+            
+        for index in range (len (sprites)):
+            cell = self.row (sprites [index] .y) * self.columns + self.column (sprites [index] .x)
+            if self.heads [cell] < 0:
+                if self.filledCount < len (self.filled):
+                    self.filled [self.filledCount] = cell
+                else:
+                    self.filled.append (cell)
+                self.filledCount += 1
+            self.next [index] = self.heads [cell]
+            self.heads [cell] = index
+            
+    def near (self, sprite):            # Put the other sprites in the 3 x 3 cells around sprite in found, return their number
+        column = self.column (sprite.x)
+        row = self.row (sprite.y)
+        count = 0
+        for neighbourRow in range (Math.max (0, row - 1), Math.min (self.rows, row + 2)):
+            for neighbourColumn in range (Math.max (0, column - 1), Math.min (self.columns, column + 2)):
+                index = self.heads [neighbourRow * self.columns + neighbourColumn]
+                while index >= 0:
+                    if self.sprites [index] is not sprite:
+                        if count < len (self.found):
+                            self.found [count] = self.sprites [index]
+                        else:
+                            self.found.append (self.sprites [index])
+                        count += 1
+                    index = self.next [index]
+        return count
+
 class Attribute:    # Attribute in the gaming sense of the word, rather than of an object
     def __init__ (self, game):
         self.game = game                    # Attribute knows game it's part of
         self.game.attributes.append (self)  # Game knows all its attributes
+        self.game.pool.register (self)      # Graphical representation is kept in the game's pool
         self.install ()                     # Put in place graphical representation of attribute
         self.reset ()                       # Reset attribute to start position
                 
@@ -53,18 +180,14 @@ class Sprite (Attribute):   # Here, a sprite is an attribute that can move
     def __init__ (self, game, width, height):
         self.width = width
         self.height = height
+        game.sprites.append (self)          # Sprites take part in the broad phase
         Attribute.__init__ (self, game)
         
     def install (self):     # The sprite holds an image that fabric can display
-        red = 0
-        green = 255
-        blue = 0
-        color = (f'rbg({red},{green},{blue})')
-
-        self.image = __new__ (fabric.Rect ({
+        self.image = self.game.pool.rect (self, 'image', {
             'width': self.game.scaleX (self.width), 'height': self.game.scaleY (self.height),
             'originX': 'center', 'originY': 'center', 'fill': 'white'
-        }))
+        })
         
     __pragma__ ('kwargs')
     def reset (self, vX = 0, vY = 0, x = 0, y = 0):
@@ -136,6 +259,10 @@ class Paddle (Sprite):
         
         
     def predict (self): # Let paddle react on keys
+        self.steer ()
+        Sprite.predict (self)                   # Do not yet commit, paddle may bounce with walls
+        
+    def steer (self):
         self.vY = 0
         
         if self.index:                          # Right player
@@ -148,25 +275,135 @@ class Paddle (Sprite):
                 self.vY = self.speed
             elif self.game.keyCode == ord ('Z'):
                 self.vY = -self.speed
-                
-        Sprite.predict (self)                   # Do not yet commit, paddle may bounce with walls
 
     def interact (self):    # Paddles and ball assumed infinitely thin
         # Paddle touches wall
         self.y = Math.max (self.height // 2 - fieldHeight // 2, Math.min (self.y, fieldHeight // 2 - self.height // 2))
+        self.hit ()
+        
+    def hit (self):         # Paddle hits ball, only balls in neighbouring grid cells can be close enough
+        for index in range (self.game.grid.near (self)):
+            ball = self.game.grid.found [index]
+            if (
+                isinstance (ball, Ball)
+                and (self.y - self.height // 2) < ball.y < (self.y + self.height // 2)
+                and (
+                    (self.index == 0 and ball.x < self.x) # On or behind left paddle
+                    or
+                    (self.index == 1 and ball.x > self.x) # On or behind right paddle
+                )
+            ):
+                ball.x = self.x                     # Ball may have gone too far already
+                ball.vX = -ball.vX                  # Bounce on paddle
+                ball.speedUp (self)
+        
+class SpriteArrays:     # Struct of arrays sprite state, integration, clamping and projection are single passes over typed arrays
+    def __init__ (self, capacity):
+        self.count = 0
+        self.x = __new__ (Float64Array (capacity))
+        self.y = __new__ (Float64Array (capacity))
+        self.vX = __new__ (Float64Array (capacity))
+        self.vY = __new__ (Float64Array (capacity))
+        self.halfHeight = __new__ (Float64Array (capacity))
+        self.left = __new__ (Float64Array (capacity))   # Projected canvas coordinates
+        self.top = __new__ (Float64Array (capacity))
+        self.images = []
+        
+    def allocate (self, sprite):        # Reserve a slot for sprite, its image is filled in on install
+        slot = self.count
+        self.count += 1
+        self.halfHeight [slot] = sprite.height // 2
+        self.images.append (None)
+        return slot
+        
+    def integrate (self, deltaT):
+        x, y, vX, vY = self.x, self.y, self.vX, self.vY
+        for slot in range (self.count):
+            x [slot] += vX [slot] * deltaT
+            y [slot] += vY [slot] * deltaT
+            
+    def clamp (self):                   # Keep sprites between top and bottom wall
+        y, halfHeight = self.y, self.halfHeight
+        for slot in range (self.count):
+            y [slot] = Math.max (halfHeight [slot] - fieldHeight // 2, Math.min (y [slot], fieldHeight // 2 - halfHeight [slot]))
+            
+    def project (self):                 # Game.orthoX and Game.orthoY inlined, then handed to fabric
+        for slot in range (self.count):
+            self.left [slot] = self.x [slot] + orthoWidth // 2
+            self.top [slot] = orthoHeight - fieldHeight // 2 - self.y [slot]
+        self.place ()
+            
+    def place (self):
+        for slot in range (self.count):
+            self.images [slot] .left = self.left [slot]
+            self.images [slot] .top = self.top [slot]
+            
+__pragma__ ('skip')
+def integrate (self, deltaT):           # Under CPython, NumPy runs each pass as a vector operation
+    count = self.count
+    self.x [:count] += self.vX [:count] * deltaT
+    self.y [:count] += self.vY [:count] * deltaT
+    
+def clamp (self):
+    count = self.count
+    numpy.clip (
+        self.y [:count], self.halfHeight [:count] - fieldHeight // 2, fieldHeight // 2 - self.halfHeight [:count],
+        out = self.y [:count]
+    )
+    
+def project (self):
+    count = self.count
+    numpy.add (self.x [:count], orthoWidth // 2, out = self.left [:count])
+    numpy.subtract (orthoHeight - fieldHeight // 2, self.y [:count], out = self.top [:count])
+    self.place ()
+    
+SpriteArrays.integrate = integrate
+SpriteArrays.clamp = clamp
+SpriteArrays.project = project
+__pragma__ ('noskip')
+            
+class ArrayPaddle (Paddle):     # Paddle whose position and speed live in the game's SpriteArrays
+    def __init__ (self, game, index):
+        self.store = game.store
+        self.slot = self.store.allocate (self)
+        Paddle.__init__ (self, game, index)
+        
+    def install (self):
+        Paddle.install (self)
+        self.store.images [self.slot] = self.image
         
-        # Paddle hits ball
-        if (
-            (self.y - self.height // 2) < self.game.ball.y < (self.y + self.height // 2)
-            and (
-                (self.index == 0 and self.game.ball.x < self.x) # On or behind left paddle
-                or
-                (self.index == 1 and self.game.ball.x > self.x) # On or behind right paddle
-            )
-        ):
-            self.game.ball.x = self.x               # Ball may have gone too far already
-            self.game.ball.vX = -self.game.ball.vX  # Bounce on paddle
-            self.game.ball.speedUp (self)
+    def predict (self):     # Integration is done for all paddles at once
+        self.steer ()
+        
+    def interact (self):    # So is keeping them inside the walls
+        self.hit ()
+        
+    def commit (self):      # And projection
+        pass
+        
+    def getX (self):
+        return self.store.x [self.slot]
+    def setX (self, x):
+        self.store.x [self.slot] = x
+    x = property (getX, setX)
+    
+    def getY (self):
+        return self.store.y [self.slot]
+    def setY (self, y):
+        self.store.y [self.slot] = y
+    y = property (getY, setY)
+    
+    def getVX (self):
+        return self.store.vX [self.slot]
+    def setVX (self, vX):
+        self.store.vX [self.slot] = vX
+    vX = property (getVX, setVX)
+    
+    def getVY (self):
+        return self.store.vY [self.slot]
+    def setVY (self, vY):
+        self.store.vY [self.slot] = vY
+    vY = property (getVY, setVY)
         
 class Ball (Sprite):
     side = 8
@@ -215,22 +452,26 @@ class Scoreboard (Attribute):
     hintShift = 25
             
     def install (self): # Graphical representation of scoreboard are four labels and a separator line
-        self.playerLabels = [__new__ (fabric.Text ('Player {}'.format (name), {
-                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}' .format (self.game.canvas.width / 30),
+        self.playerLabels = [self.game.pool.text (self, name, 'Player {}'.format (name), {
+                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}' .format (orthoWidth / 30),
                 'left': self.game.orthoX (position * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.nameShift)
-        })) for name, position in (('AZ keys:', -7/16), ('KM keys:', 1/16))]
+        }) for name, position in (('AZ keys:', -7/16), ('KM keys:', 1/16))]
         
-        self.hintLabel = __new__ (fabric.Text ('[spacebar] starts game, [enter] resets score', {
-                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (self.game.canvas.width / 70),
+        self.hintLabel = self.game.pool.text (self, 'hint', '[spacebar] starts game, [enter] resets score', {
+                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (orthoWidth / 70),
                 'left': self.game.orthoX (-7/16 * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.hintShift)
-        }))
-        
-        self.image = __new__ (fabric.Line ([
-                self.game.orthoX (-orthoWidth // 2), self.game.orthoY (fieldHeight // 2),
-                self.game.orthoX (orthoWidth // 2), self.game.orthoY (fieldHeight // 2)
-            ],
-            {'stroke': 'white'}
-        ))
+        })
+        
+        self.scoreLabels = [self.game.pool.text (self, name, '0', {
+                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (orthoWidth / 30),
+                'left': self.game.orthoX (position * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.nameShift)
+        }) for name, position in (('score0', -2/16), ('score1', 6/16))]
+        
+        self.image = self.game.pool.line (self, 'image', {
+                'x1': self.game.orthoX (-orthoWidth // 2), 'y1': self.game.orthoY (fieldHeight // 2),
+                'x2': self.game.orthoX (orthoWidth // 2), 'y2': self.game.orthoY (fieldHeight // 2),
+                'stroke': 'white'
+        })
                 
     def increment (self, playerIndex):
         self.scores [playerIndex] += 1
@@ -239,11 +480,11 @@ class Scoreboard (Attribute):
         self.scores = [0, 0]
         Attribute.reset (self)  # Only does a commit here
         
-    def commit (self):          # Committing labels is adapting their texts
-        self.scoreLabels = [__new__ (fabric.Text ('{}'.format (score), {
-                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (self.game.canvas.width / 30),
-                'left': self.game.orthoX (position * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.nameShift)
-        })) for score, position in zip (self.scores, (-2/16, 6/16))]
+    def commit (self):          # Committing labels is adapting their texts, in place
+        for index in range (len (self.scores)):
+            text = str (self.scores [index])
+            if self.scoreLabels [index] .text != text:  # Only touch fabric when the score actually changed
+                self.scoreLabels [index] .set ('text', text)
 
     def draw (self):
         for playerLabel, scoreLabel in zip (self.playerLabels, self.scoreLabels):
@@ -266,7 +507,9 @@ class Experiment:
 
         set_size = 6
 
+        self.pool = Pool ()
         self.attributes = []
+        self.sprites = []
         squares = [Square(self,index) for index in range(set_size)]
         self.squares = [Square.set(square) for square in squares]
         
@@ -305,6 +548,7 @@ class Experiment:
         oldTime = self.time
         self.time = + __new__ (Date)
         self.deltaT = (self.time - oldTime) / 1000.
+        self.pool.sample (self.time)            # Keep track of fabric allocations per second
         
         if self.pause:                          # If in paused state
             if self.keyCode == space:           #   If spacebar hit
@@ -351,16 +595,54 @@ class Game:
         self.canvas.lineWidth = 2
         self.canvas.clear ()    
 
-        self.set_size = 6
+        self.set_size = 6                           # Until the staircase has chosen
+        self.nextSetSize = self.set_size
+        self.pool = Pool ()                         # Fabric primitives, reused across installs and commits
         self.attributes = []                        # All attributes will insert themselves here
-        self.paddles = [Paddle (self, index) for index in range (self.set_size)]    # Pass game as parameter self
+        self.sprites = []                           # Sprites among them, which also insert themselves here
+        self.grid = Grid (cellSize)
+        self.store = SpriteArrays (maxSetSize) if batchedSprites else None
+        paddleClass = ArrayPaddle if batchedSprites else Paddle
+        self.paddles = [paddleClass (self, index) for index in range (maxSetSize)]    # Pass game as parameter self
         self.ball = Ball (self)
+        self.scoreboard = None                      # The K task shows no scores
         #self.scoreboard = Scoreboard (self)     
 
+        self.session = window.sessionStorage.getItem ('session')   # Kept over a page refresh, so the session can be resumed
+        if self.session is None:
+            self.session = makeSessionId ()
+            window.sessionStorage.setItem ('session', self.session)
+            window.sessionStorage.setItem ('seed', Math.floor (Math.random () * 4294967296))
+        self.seed = int (window.sessionStorage.getItem ('seed'))
+        self.trialIndex = 0
+        self.pending = 0                            # Uploads the server has not acknowledged yet
+        self.binary = binaryUploads                 # Until the server turns a binary batch down
+        self.serverErrors = 0                       # Uploads in a row that failed on the server
+        window.fetch (sessionsUrl + self.session + '/resume') .then (
+            lambda response: response.json () if response.ok else None
+        ) .then (self.resume)
+        window.fetch (sessionsUrl + self.session + '/staircase') .then (
+            lambda response: response.json () if response.ok else None
+        ) .then (self.adapt)
+        self.trials = []                            # Finished trials, waiting to be uploaded
+        self.palette = []                           # Colour strings, far apart in CIELAB, see palette.py
+        self.paletteOrder = []                      # Indices into palette, the first ones of a trial are its sample
+        self.fetchPalette ()                        # No trial starts before it is loaded
+        self.stimulus = None                        # Set size and whether the probe changes, of the current trial
+        self.lastStimulus = None                    # Of the trial waiting to be finished
+        self.phase = None
+        self.pendingPhase = None                    # Phase that changed in update, but has not been drawn yet
+        self.onsets = [None, None, None, None, None]    # Frame times of memory, blank, test, intertrial and next memory display
+        self.response = None
+        self.rt = None
+        self.lastFrame = None
+        self.frameIntervals = []                    # Frame to frame times during the current trial
+
         window.setInterval (self.update, 10)    # Install update callback, time in ms
-        window.setInterval (self.draw, 20)      # Install draw callback, time in ms
+        window.requestAnimationFrame (self.frame)   # Draw once per display refresh, so onsets are known to the frame
         window.addEventListener ('keydown', self.keydown)
         window.addEventListener ('keyup', self.keyup)
+        window.addEventListener ('pagehide', self.upload)   # Don't lose the last, partial batch
         
         self.buttons = []
         
@@ -383,7 +665,8 @@ class Game:
         self.trial_set = bool
         self.target_color = []
         
-        window.onresize = self.resize
+        self.resizePending = False
+        window.onresize = self.requestResize
         self.resize ()
         
     def install (self):
@@ -398,6 +681,7 @@ class Game:
                 self.keyCode = enter
             else:
                 self.keyCode = ord (key)
+            self.respond (self.keyCode, window.performance.now ())
         else:
             self.keyCode = None
     
@@ -405,6 +689,7 @@ class Game:
         oldTime = self.time
         self.time = + __new__ (Date)
         self.deltaT = (self.time - oldTime) / 1000.
+        self.pool.sample (self.time)            # Keep track of fabric allocations per second
 
         self.update_squares()
         
@@ -413,33 +698,62 @@ class Game:
         if self.pause:                          # If in paused state
             if self.keyCode == space:           #   If spacebar hit
                 self.pause = False              #         Start playing
-            elif self.keyCode == enter:         #   Else if enter hit
+            elif self.keyCode == enter and self.scoreboard:    #   Else if enter hit
                 self.scoreboard.reset ()        #         Reset score
         else:                                   # Else, so if in active state
             for attribute in self.attributes:   #   Compute predicted values
                 attribute.predict ()
+                
+            if self.store is not None:          #   Batched sprites move and stay inside the walls all at once
+                self.store.integrate (self.deltaT)
+                self.store.clamp ()
+                
+            self.grid.rebuild (self.sprites)    #   Find out who is near whom
             
             for attribute in self.attributes:   #   Correct values for bouncing and scoring
                 attribute.interact ()
             
             for attribute in self.attributes:   #   Commit them to pyglet for display
                 attribute.commit ()
+                
+        if self.store is not None:              # Batched sprites may also have been reset by update_squares
+            self.store.project ()
 
     def update_squares(self):
+        if not len (self.paletteOrder):         # Without the palette, colours can't be told apart as promised, so wait
+            for paddle in self.paddles:
+                paddle.image.visible = False
+            self.start_exp_timer = self.time
+            return
+        
         self.delta_exp_timer = (self.time - self.start_exp_timer)
         
+        if self.delta_exp_timer <= 1000:
+            phase = 0
+        elif self.delta_exp_timer <= 1250:
+            phase = 1
+        elif self.delta_exp_timer <= 2000:
+            phase = 2
+        else:
+            phase = 3
+            
+        if phase != self.phase:                 # Display changes now, its onset is stamped by the frame that shows it
+            self.phase = phase
+            self.pendingPhase = phase
+        
         if self.delta_exp_timer <= 1000:
             if self.trial_set != True:
+                self.lastStimulus = self.stimulus
+                self.set_size = self.nextSetSize
+                self.stimulus = {'setSize': self.set_size, 'changed': Math.random () < 0.5}
+                
+                self.sampleColors (self.set_size + 1)  # One more for a changed probe
+                
                 for paddle in self.paddles:
 
                     paddle.reset()
-
-                    red = 255 * Math.random()
-                    green = 255 * Math.random()
-                    blue = 255 * Math.random()
-                    color = f'rgb({red},{green},{blue})'
-
-                    paddle.image.fill = color
+                    paddle.image.visible = paddle.index < self.set_size     # Squares beyond the set size sit this trial out
+                    paddle.image.fill = self.color (paddle.index)
 
                     if paddle == self.paddles[0]:
                         self.target_color = paddle.image.fill
@@ -458,6 +772,8 @@ class Game:
                 for paddle in self.paddles:
                     if paddle.index > 0:
                         paddle.image.fill = self.canvas.backgroundColor
+                    elif self.stimulus ['changed']:
+                        paddle.image.fill = self.color (self.set_size)     # Not shown in the memory display
                     else:
                         paddle.image.fill = self.target_color 
 
@@ -486,8 +802,33 @@ class Game:
         
         
 
+    def fetchPalette (self):
+        window.fetch (window.paletteUrl) .then (
+            lambda response: response.text () if response.ok else ''
+        ) .then (self.loadPalette) .catch (
+            lambda error: self.loadPalette ('')
+        )
+        
+    def loadPalette (self, text):               # One colour per CSV line after the header
+        palette = [line.split (',') [0] for line in text.split ('\n') [1:] if line]
+        if len (palette) <= maxSetSize:         # Failed or cut short, a changed probe needs a colour beyond the largest sample
+            window.setTimeout (self.fetchPalette, paletteRetry)
+            return
+        self.palette = palette
+        self.paletteOrder = [index for index in range (len (palette))]
+        
+    def sampleColors (self, count):             # Partial Fisher-Yates shuffle, afterwards the first count palette indices are a sample without replacement
+        order = self.paletteOrder
+        for index in range (Math.min (count, len (order))):
+            other = index + Math.floor (Math.random () * (len (order) - index))
+            order [index], order [other] = order [other], order [index]
+            
+    def color (self, index):                    # Colour index of the current sample
+        return self.palette [self.paletteOrder [index]]
+        
     def scored (self, playerIndex):             # Player has scored
-        self.scoreboard.increment (playerIndex) # Increment player's points
+        if self.scoreboard:
+            self.scoreboard.increment (playerIndex) # Increment player's points
         self.serviceIndex = 1 - playerIndex     # Grant service to the unlucky player
         
         '''
@@ -507,8 +848,159 @@ class Game:
         self.canvas.clear ()
         for attribute in self.attributes:
             attribute.draw ()
+            
+    def frame (self, timestamp):                # Animation frame callback, timestamp is in performance.now () time
+        if self.lastFrame is not None:
+            self.frameIntervals.append (timestamp - self.lastFrame)
+        self.lastFrame = timestamp
+        
+        self.draw ()
+        
+        if self.pendingPhase is not None:       # This frame is the first one showing the new phase
+            if self.pendingPhase == 0 and self.onsets [0] is not None:
+                self.onsets [4] = timestamp     # Next memory display ends the intertrial interval of the previous trial
+                self.finishTrial ()
+            self.onsets [self.pendingPhase] = timestamp
+            self.pendingPhase = None
+            
+        window.requestAnimationFrame (self.frame)
+        
+    def respond (self, keyCode, timestamp):     # Only the first response after test display onset counts, other keys and buttons are no answer
+        if keyCode not in (sameKey, differentKey):
+            return
+        if self.response is None and self.onsets [2] is not None:
+            self.response = keyCode
+            self.rt = timestamp - self.onsets [2]
+            
+    def finishTrial (self):                     # Store response and timing diagnostics, then start a fresh trial record
+        intervals = sorted (self.frameIntervals, key = lambda interval: interval)  # With a key, JavaScript compares numbers rather than strings
+        period = intervals [len (intervals) // 2] if len (intervals) else 0    # Median frame time
+        droppedFrames = 0
+        for interval in self.frameIntervals:
+            if interval > 1.5 * period:
+                droppedFrames += Math.round (interval / period) - 1
+                
+        changed = self.lastStimulus ['changed']
+        correct = (self.response == differentKey and changed) or (self.response == sameKey and not changed)
+        trial = {
+            'trial': self.trialIndex,
+            'block': self.trialIndex // trialsPerBlock,
+            'seed': self.seed,
+            'setSize': self.lastStimulus ['setSize'],
+            'key': self.response if self.response is not None else 0,
+            'changed': 1 if changed else 0,
+            'correct': 1 if correct else 0,
+            'rt': self.rt if self.rt is not None else -1,
+            'durations': [self.onsets [index + 1] - self.onsets [index] for index in range (4)],
+            'droppedFrames': Math.min (droppedFrames, 65535),  # A hidden tab gets no frames for as long as it's hidden, the field is 16 bits
+            'refreshRate': 1000 / period if period else 0
+        }
+        self.trials.append (trial)
+        if self.response is not None:           # Unanswered trials tell nothing about capacity
+            self.step (trial)
+        
+        self.trialIndex += 1
+        self.onsets = [None, None, None, None, None]
+        self.response = None
+        self.rt = None
+        self.frameIntervals = []
+        
+        if len (self.trials) >= trialsPerBatch:
+            self.upload ()
+            
+    def upload (self):                          # Send finished trials to the server, keepalive lets this outlive the page
+        if not len (self.trials):
+            return
+        batch = self.trials
+        self.trials = []
+        self.pending += 1
+        binary = self.binary
+        if binary:
+            contentType, body = 'application/octet-stream', self.encode (batch)
+        else:
+            contentType, body = 'application/json', window.JSON.stringify ({'session': self.session, 'pending': self.pending, 'trials': batch})
+        window.fetch (trialsUrl, {
+            'method': 'POST',
+            'headers': {'Content-Type': contentType},
+            'body': body,
+            'keepalive': True
+        }) .then (
+            lambda response: self.acknowledge (batch, response.status, binary)
+        ) .catch (
+            lambda error: self.acknowledge (batch, 0, binary)
+        )
+        
+    def encode (self, batch):                   # Header and fixed-width little-endian records, as trial_store.TRIAL_DTYPE
+        buffer = __new__ (ArrayBuffer (batchHeaderSize + recordSize * len (batch)))
+        view = __new__ (DataView (buffer))
+        for index in range (len (batchMagic)):
+            view.setUint8 (index, ord (batchMagic [index]))
+        view.setUint8 (4, batchVersion)
+        view.setUint16 (6, self.pending, True)
+        view.setUint16 (8, len (batch), True)
+        for index in range (len (self.session)):   # Rest of the 64 bytes stays 0
+            view.setUint8 (10 + index, ord (self.session [index]))
+            
+        offset = batchHeaderSize
+        for trial in batch:
+            view.setUint32 (offset, trial ['trial'], True)
+            view.setUint16 (offset + 4, trial ['block'], True)
+            view.setUint32 (offset + 6, trial ['seed'], True)
+            view.setUint8 (offset + 10, trial ['setSize'])
+            view.setUint16 (offset + 11, trial ['key'], True)
+            view.setUint8 (offset + 13, trial ['changed'])
+            view.setUint8 (offset + 14, trial ['correct'])
+            view.setFloat64 (offset + 15, trial ['rt'], True)
+            for index in range (4):
+                view.setFloat64 (offset + 23 + 8 * index, trial ['durations'] [index], True)
+            view.setUint16 (offset + 55, trial ['droppedFrames'], True)
+            view.setFloat32 (offset + 57, trial ['refreshRate'], True)
+            offset += recordSize
+        return buffer
+        
+    def step (self, trial):                     # Let the staircase choose the set size of the next trial but one
+        window.fetch (sessionsUrl + self.session + '/staircase', {
+            'method': 'POST',
+            'headers': {'Content-Type': 'application/json'},
+            'body': window.JSON.stringify ({'trial': trial ['trial'], 'setSize': trial ['setSize'], 'correct': trial ['correct']})
+        }) .then (
+            lambda response: response.json () if response.ok else None
+        ) .then (self.adapt) .catch (
+            lambda error: None                  # Keep the current set size
+        )
+        
+    def adapt (self, step):
+        if step:
+            self.nextSetSize = step ['setSize']
+            
+    def acknowledge (self, batch, status, binary):  # Put a batch back in line when the network or the server failed on it
+        self.pending -= 1
+        if binary and status in (400, 415):     # Server that can't take binary batches, resend this one and the next as JSON
+            self.binary = False
+            status = 0
+        if status >= 500:                       # A batch the server fails on may fail forever, don't keep it in line for good
+            self.serverErrors += 1
+            if self.serverErrors > maxServerErrors:
+                self.serverErrors = 0
+                return
+        elif status:
+            self.serverErrors = 0
+        if status == 0 or status >= 500:
+            for trial in self.trials:
+                batch.append (trial)
+            self.trials = batch
+            
+    def resume (self, progress):                # Continue counting trials where the session was before a refresh
+        if progress:
+            self.trialIndex += progress ['trial']
+                
+    def requestResize (self, event = None):     # Window drags fire many resize events, handle at most one per frame
+        if not self.resizePending:
+            self.resizePending = True
+            window.requestAnimationFrame (self.resize)
                 
-    def resize (self):
+    def resize (self, timestamp = None):        # Relayout and rescale the view, graphical objects are left as they are, timestamp is given when called as animation frame
+        self.resizePending = False
         self.pageWidth = window.innerWidth
         self.pageHeight = window.innerHeight
         
@@ -534,20 +1026,21 @@ class Game:
         self.canvasFrame.style.top = self.canvasTop
         self.canvasFrame.style.left = self.canvasLeft
         self.canvas.setDimensions ({'width': self.canvasWidth, 'height': self.canvasHeight})
+        self.canvas.setViewportTransform ([     # Objects stay in ortho coordinates, fabric scales them to the canvas
+            self.canvasWidth / orthoWidth, 0, 0, self.canvasHeight / orthoHeight, 0, 0
+        ])
         
         self.buttonsFrame.style.top = self.buttonsTop
         self.buttonsFrame.style.left = 0.5 * (self.pageWidth - self.buttonsWidth)
         self.buttonsFrame.style.width = self.canvasWidth
         
-        self.install ()
-        self.commit ()
-        self.draw ()
+        self.canvas.renderAll ()
         
-    def scaleX (self, x):
-        return x * (self.canvas.width / orthoWidth)
+    def scaleX (self, x):   # Canvas coordinates are ortho coordinates, the viewport transform does the actual scaling
+        return x
             
     def scaleY (self, y):
-        return y * (self.canvas.height / orthoHeight)   
+        return y
         
     def orthoX (self, x):
         return self.scaleX (x + orthoWidth // 2)
@@ -557,6 +1050,8 @@ class Game:
                 
     def keydown (self, event):
         self.keyCode = event.keyCode
+        # event.timeStamp shares performance.now ()'s clock, except in old browsers that still give epoch time
+        self.respond (event.keyCode, event.timeStamp if event.timeStamp < 1e12 else window.performance.now ())
         
     def keyup (self, event):
         self.keyCode = None 
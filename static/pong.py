@@ -5,6 +5,10 @@
 #
 # transcrypt -b static/pong.py
 #
+# or, to compile only what changed and refresh the cache busting tables as well,
+#
+# flask build-assets
+#
 # this will create a folder called __target__ with these files:
 # -com.fabric.js
 # -org.transcrypt.__runtime__.js
@@ -28,12 +32,59 @@ fieldHeight = 650
 
 enter, esc, space = 13, 27, 32
 
+timeStep = 1 / 120  # s, physics always advances in steps of this size, whatever the frame rate
+maxSteps = 12       # Most steps taken per update, a slow machine gets a slower game rather than an ever longer backlog
+
 window.onkeydown = lambda event: event.keyCode != space # Prevent scrolldown on spacebar press
 
+class Pool:     # Fabric primitives are kept here and updated in place, rather than reallocated on every install or commit
+    def __init__ (self):
+        self.slots = []                 # One slot of named primitives per attribute
+        self.allocations = 0            # Number of fabric objects ever created through the pool
+        self.allocationRate = 0         # Allocations per second, measured over the last sample
+        self.sampleTime = None
+        self.sampleAllocations = 0
+        
+    def register (self, owner):         # Give an attribute its own slot
+        owner.poolIndex = len (self.slots)
+        self.slots.append ({})
+        
+    def reuse (self, owner, name, options):     # Update an existing primitive in place, None if it still has to be made
+        slot = self.slots [owner.poolIndex]
+        if name in slot:
+            slot [name] .set (options)
+            return slot [name]
+        return None
+        
+    def keep (self, owner, name, image):        # Store a freshly made primitive for later reuse
+        self.slots [owner.poolIndex][name] = image
+        self.allocations += 1
+        return image
+        
+    def rect (self, owner, name, options):
+        return self.reuse (owner, name, options) or self.keep (owner, name, __new__ (fabric.Rect (options)))
+        
+    def text (self, owner, name, content, options):     # Content is only used when the label is first made
+        return self.reuse (owner, name, options) or self.keep (owner, name, __new__ (fabric.Text (content, options)))
+        
+    def line (self, owner, name, options):
+        return self.reuse (owner, name, options) or self.keep (owner, name, __new__ (fabric.Line (
+            [options ['x1'], options ['y1'], options ['x2'], options ['y2']], options
+        )))
+        
+    def sample (self, time):            # Called every update, refreshes allocationRate once a second
+        if self.sampleTime is None:
+            self.sampleTime = time
+        elif time - self.sampleTime >= 1000:
+            self.allocationRate = (self.allocations - self.sampleAllocations) * 1000 / (time - self.sampleTime)
+            self.sampleTime = time
+            self.sampleAllocations = self.allocations
+
 class Attribute:    # Attribute in the gaming sense of the word, rather than of an object
     def __init__ (self, game):
         self.game = game                    # Attribute knows game it's part of
         self.game.attributes.append (self)  # Game knows all its attributes
+        self.game.pool.register (self)      # Graphical representation is kept in the game's pool
         self.install ()                     # Put in place graphical representation of attribute
         self.reset ()                       # Reset attribute to start position
                 
@@ -56,10 +107,10 @@ class Sprite (Attribute):   # Here, a sprite is an attribute that can move
         Attribute.__init__ (self, game)
         
     def install (self):     # The sprite holds an image that fabric can display
-        self.image = __new__ (fabric.Rect ({
+        self.image = self.game.pool.rect (self, 'image', {
             'width': self.game.scaleX (self.width), 'height': self.game.scaleY (self.height),
             'originX': 'center', 'originY': 'center', 'fill': 'white'
-        }))
+        })
         
     __pragma__ ('kwargs')
     def reset (self, vX = 0, vY = 0, x = 0, y = 0):
@@ -69,16 +120,22 @@ class Sprite (Attribute):   # Here, a sprite is an attribute that can move
         self.x = x          # Predicted position, can be commit, no bouncing initially
         self.y = y
         
+        self.previousX = x  # Position one time step ago, nothing to interpolate from after a reset
+        self.previousY = y
+        
         Attribute.reset (self)
     __pragma__ ('nokwargs')
         
     def predict (self):     # Predict position, do not yet commit, bouncing may alter it
+        self.previousX = self.x
+        self.previousY = self.y
         self.x += self.vX * self.game.deltaT
         self.y += self.vY * self.game.deltaT
 
-    def commit (self):      # Update fabric image for asynch draw
-        self.image.left = self.game.orthoX (self.x)
-        self.image.top = self.game.orthoY (self.y)
+    def commit (self):      # Update fabric image for asynch draw, interpolated between the last two time steps
+        alpha = self.game.alpha
+        self.image.left = self.game.orthoX (self.previousX + (self.x - self.previousX) * alpha)
+        self.image.top = self.game.orthoY (self.previousY + (self.y - self.previousY) * alpha)
         
     def draw (self):
         self.game.canvas.add (self.image)
@@ -120,18 +177,21 @@ class Paddle (Sprite):
         # Paddle touches wall
         self.y = Math.max (self.height // 2 - fieldHeight // 2, Math.min (self.y, fieldHeight // 2 - self.height // 2))
         
-        # Paddle hits ball
+        # Paddle hits ball, tested along the ball's whole path during this step, so a fast ball can't pass through
+        ball = self.game.ball
         if (
-            (self.y - self.height // 2) < self.game.ball.y < (self.y + self.height // 2)
-            and (
-                (self.index == 0 and self.game.ball.x < self.x) # On or behind left paddle
-                or
-                (self.index == 1 and self.game.ball.x > self.x) # On or behind right paddle
-            )
+            (self.index == 0 and ball.previousX >= self.x > ball.x)    # Crossed left paddle's line, moving left
+            or
+            (self.index == 1 and ball.previousX <= self.x < ball.x)    # Crossed right paddle's line, moving right
         ):
-            self.game.ball.x = self.x               # Ball may have gone too far already
-            self.game.ball.vX = -self.game.ball.vX  # Bounce on paddle
-            self.game.ball.speedUp (self)
+            fraction = (self.x - ball.previousX) / (ball.x - ball.previousX)       # Part of the step taken when crossing
+            crossingY = ball.previousY + (ball.y - ball.previousY) * fraction
+            paddleY = self.previousY + (self.y - self.previousY) * fraction
+            
+            if Math.abs (crossingY - paddleY) < self.height // 2:
+                ball.x = 2 * self.x - ball.x        # Bounce, the rest of the step is travelled back from the paddle
+                ball.vX = -ball.vX
+                ball.speedUp (self)
         
 class Ball (Sprite):
     side = 8
@@ -180,22 +240,26 @@ class Scoreboard (Attribute):
     hintShift = 25
             
     def install (self): # Graphical representation of scoreboard are four labels and a separator line
-        self.playerLabels = [__new__ (fabric.Text ('Player {}'.format (name), {
-                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}' .format (self.game.canvas.width / 30),
+        self.playerLabels = [self.game.pool.text (self, name, 'Player {}'.format (name), {
+                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}' .format (orthoWidth / 30),
                 'left': self.game.orthoX (position * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.nameShift)
-        })) for name, position in (('AZ keys:', -7/16), ('KM keys:', 1/16))]
+        }) for name, position in (('AZ keys:', -7/16), ('KM keys:', 1/16))]
         
-        self.hintLabel = __new__ (fabric.Text ('[spacebar] starts game, [enter] resets score', {
-                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (self.game.canvas.width / 70),
+        self.hintLabel = self.game.pool.text (self, 'hint', '[spacebar] starts game, [enter] resets score', {
+                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (orthoWidth / 70),
                 'left': self.game.orthoX (-7/16 * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.hintShift)
-        }))
-        
-        self.image = __new__ (fabric.Line ([
-                self.game.orthoX (-orthoWidth // 2), self.game.orthoY (fieldHeight // 2),
-                self.game.orthoX (orthoWidth // 2), self.game.orthoY (fieldHeight // 2)
-            ],
-            {'stroke': 'white'}
-        ))
+        })
+        
+        self.scoreLabels = [self.game.pool.text (self, name, '0', {
+                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (orthoWidth / 30),
+                'left': self.game.orthoX (position * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.nameShift)
+        }) for name, position in (('score0', -2/16), ('score1', 6/16))]
+        
+        self.image = self.game.pool.line (self, 'image', {
+                'x1': self.game.orthoX (-orthoWidth // 2), 'y1': self.game.orthoY (fieldHeight // 2),
+                'x2': self.game.orthoX (orthoWidth // 2), 'y2': self.game.orthoY (fieldHeight // 2),
+                'stroke': 'white'
+        })
                 
     def increment (self, playerIndex):
         self.scores [playerIndex] += 1
@@ -204,11 +268,11 @@ class Scoreboard (Attribute):
         self.scores = [0, 0]
         Attribute.reset (self)  # Only does a commit here
         
-    def commit (self):          # Committing labels is adapting their texts
-        self.scoreLabels = [__new__ (fabric.Text ('{}'.format (score), {
-                'fill': 'white', 'fontFamily': 'arial', 'fontSize': '{}'.format (self.game.canvas.width / 30),
-                'left': self.game.orthoX (position * orthoWidth), 'top': self.game.orthoY (fieldHeight // 2 + self.nameShift)
-        })) for score, position in zip (self.scores, (-2/16, 6/16))]
+    def commit (self):          # Committing labels is adapting their texts, in place
+        for index in range (len (self.scores)):
+            text = str (self.scores [index])
+            if self.scoreLabels [index] .text != text:  # Only touch fabric when the score actually changed
+                self.scoreLabels [index] .set ('text', text)
 
     def draw (self):
         for playerLabel, scoreLabel in zip (self.playerLabels, self.scoreLabels):
@@ -232,7 +296,10 @@ class Game:
         self.canvas.lineWidth = 2
         self.canvas.clear ()    
 
+        self.pool = Pool ()                         # Fabric primitives, reused across installs and commits
         self.attributes = []                        # All attributes will insert themselves here
+        self.accumulator = 0                        # Simulation time not yet stepped through, in s
+        self.alpha = 1                              # Draw the latest step until there is something to interpolate
         self.paddles = [Paddle (self, index) for index in range (2)]    # Pass game as parameter self
         self.ball = Ball (self)
         self.scoreboard = Scoreboard (self)     
@@ -256,7 +323,8 @@ class Game:
             
         self.time = + __new__ (Date)
         
-        window.onresize = self.resize
+        self.resizePending = False
+        window.onresize = self.requestResize
         self.resize ()
         
     def install (self):
@@ -277,19 +345,29 @@ class Game:
     def update (self):                          # Note that update and draw are not synchronized
         oldTime = self.time
         self.time = + __new__ (Date)
-        self.deltaT = (self.time - oldTime) / 1000.
+        self.pool.sample (self.time)            # Keep track of fabric allocations per second
+        
+        # Elapsed time is used up in fixed steps, what's left over carries to the next update
+        self.accumulator = Math.min (self.accumulator + (self.time - oldTime) / 1000., maxSteps * timeStep)
+        self.deltaT = timeStep
         
         if self.pause:                          # If in paused state
+            self.accumulator = 0                #   Time doesn't pile up while paused
             if self.keyCode == space:           #   If spacebar hit
                 self.pause = False              #         Start playing
             elif self.keyCode == enter:         #   Else if enter hit
                 self.scoreboard.reset ()        #         Reset score
         else:                                   # Else, so if in active state
-            for attribute in self.attributes:   #   Compute predicted values
-                attribute.predict ()
-            
-            for attribute in self.attributes:   #   Correct values for bouncing and scoring
-                attribute.interact ()
+            while self.accumulator >= timeStep and not self.pause:  # Scoring pauses the game halfway
+                for attribute in self.attributes:   #   Compute predicted values
+                    attribute.predict ()
+                
+                for attribute in self.attributes:   #   Correct values for bouncing and scoring
+                    attribute.interact ()
+                    
+                self.accumulator -= timeStep
+                
+            self.alpha = self.accumulator / timeStep    # How far between the last two steps to draw
             
             for attribute in self.attributes:   #   Commit them to pyglet for display
                 attribute.commit ()
@@ -313,7 +391,13 @@ class Game:
         for attribute in self.attributes:
             attribute.draw ()
                 
-    def resize (self):
+    def requestResize (self, event = None):     # Window drags fire many resize events, handle at most one per frame
+        if not self.resizePending:
+            self.resizePending = True
+            window.requestAnimationFrame (self.resize)
+                
+    def resize (self, timestamp = None):        # Relayout and rescale the view, graphical objects are left as they are, timestamp is given when called as animation frame
+        self.resizePending = False
         self.pageWidth = window.innerWidth
         self.pageHeight = window.innerHeight
         
@@ -339,20 +423,21 @@ class Game:
         self.canvasFrame.style.top = self.canvasTop
         self.canvasFrame.style.left = self.canvasLeft
         self.canvas.setDimensions ({'width': self.canvasWidth, 'height': self.canvasHeight})
+        self.canvas.setViewportTransform ([     # Objects stay in ortho coordinates, fabric scales them to the canvas
+            self.canvasWidth / orthoWidth, 0, 0, self.canvasHeight / orthoHeight, 0, 0
+        ])
         
         self.buttonsFrame.style.top = self.buttonsTop
         self.buttonsFrame.style.left = 0.5 * (self.pageWidth - self.buttonsWidth)
         self.buttonsFrame.style.width = self.canvasWidth
         
-        self.install ()
-        self.commit ()
-        self.draw ()
+        self.canvas.renderAll ()
         
-    def scaleX (self, x):
-        return x * (self.canvas.width / orthoWidth)
+    def scaleX (self, x):   # Canvas coordinates are ortho coordinates, the viewport transform does the actual scaling
+        return x
             
     def scaleY (self, y):
-        return y * (self.canvas.height / orthoHeight)   
+        return y
         
     def orthoX (self, x):
         return self.scaleX (x + orthoWidth // 2)
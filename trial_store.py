@@ -0,0 +1,221 @@
+import os
+import re
+import struct
+import threading
+
+import numpy
+
+# one fixed-width, little-endian record per trial, so a session's file can be
+# appended to without parsing it and read back through a memory map
+TRIAL_DTYPE = numpy.dtype([
+    ('trial', '<u4'),
+    ('block', '<u2'),
+    ('seed', '<u4'),            # random seed of the session
+    ('set_size', '<u1'),
+    ('key', '<u2'),
+    ('changed', '<u1'),         # 1 if the probe differed from the memory display
+    ('correct', '<u1'),
+    ('rt', '<f8'),              # ms from test display onset, -1 if no response
+    ('durations', '<f8', (4,)),  # achieved memory, blank, test and intertrial durations in ms
+    ('dropped_frames', '<u2'),
+    ('refresh_rate', '<f4'),    # Hz, 0 if it could not be measured
+])
+
+# client-side names of the record fields, in `TRIAL_DTYPE` order
+TRIAL_FIELDS = {
+    'trial': 'trial',
+    'block': 'block',
+    'seed': 'seed',
+    'set_size': 'setSize',
+    'key': 'key',
+    'changed': 'changed',
+    'correct': 'correct',
+    'rt': 'rt',
+    'durations': 'durations',
+    'dropped_frames': 'droppedFrames',
+    'refresh_rate': 'refreshRate',
+}
+
+# binary upload of a batch: this header, then `count` records laid out as `TRIAL_DTYPE`
+# magic, format version, padding, batches pending on the client, count, NUL-padded session id
+BATCH_HEADER = struct.Struct('<4sBxHH64s')
+BATCH_MAGIC = b'KTRB'
+BATCH_VERSION = 1
+BATCH_MIMETYPE = 'application/octet-stream'
+
+NOMINAL_DURATIONS = numpy.array([1000, 250, 750, 500], dtype='<f8')
+
+SESSION_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+
+def poor_timing(records, tolerance=1.5):
+    """
+    Flag trials with unreliable stimulus timing.
+
+    :param records: array of `TRIAL_DTYPE` records
+    :param tolerance: allowed deviation from the nominal durations, in frames
+    :return: boolean array, True where a phase was off by more than
+        `tolerance` frames, frames were dropped or the refresh rate is unknown
+    """
+    refresh_rate = records['refresh_rate'].astype('f8')
+    frame = 1000 / numpy.where(refresh_rate > 0, refresh_rate, 1)
+    deviation = numpy.abs(records['durations'] - NOMINAL_DURATIONS).max(axis=1)
+    return (
+        (deviation > tolerance * frame)
+        | (records['dropped_frames'] > 0)
+        | (refresh_rate <= 0)
+    )
+
+
+def check_integer(name, value, dtype):
+    """
+    :param name: name of the value in error messages
+    :param dtype: integer dtype the value is stored as
+    :return: `value`
+    :raise ValueError: if `value` is not an int in the range of `dtype`,
+        which NumPy would otherwise wrap around or truncate silently
+    """
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f'`{name}` must be an integer')
+    info = numpy.iinfo(dtype)
+    if not info.min <= value <= info.max:
+        raise ValueError(f'`{name}` must be between {info.min} and {info.max}')
+    return value
+
+
+def check_field(name, value, dtype):
+    """
+    :raise ValueError: if `value` can't be stored as `dtype` unchanged
+    """
+    if dtype.subdtype is not None:
+        base, shape = dtype.subdtype
+        if not isinstance(value, list) or len(value) != numpy.prod(shape):
+            raise ValueError(f'`{name}` must be a list of {numpy.prod(shape)} numbers')
+        for item in value:
+            check_field(name, item, base)
+    elif dtype.kind in 'ui':
+        check_integer(name, value, dtype)
+    elif isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f'`{name}` must be a number')
+
+
+def trials_to_records(trials):
+    """
+    :param trials: list of dicts keyed by the names in `TRIAL_FIELDS`, as
+        decoded from the client's JSON
+    :return: array of `TRIAL_DTYPE` records
+    :raise ValueError: if a trial misses a field or has one of the wrong
+        type or out of range
+    """
+    try:
+        for trial in trials:
+            for name, key in TRIAL_FIELDS.items():
+                check_field(key, trial[key], TRIAL_DTYPE[name])
+        return numpy.array([
+            tuple(trial[key] for key in TRIAL_FIELDS.values())
+            for trial in trials
+        ], dtype=TRIAL_DTYPE)
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f'malformed trial: {e}') from e
+
+
+def decode_batch(body):
+    """
+    Decode a binary batch upload, without copying its records.
+
+    :param body: bytes of the request body
+    :return: session id, client's pending count and read-only array of
+        `TRIAL_DTYPE` records
+    :raise ValueError: if `body` is not a complete batch
+    """
+    if len(body) < BATCH_HEADER.size:
+        raise ValueError('batch is shorter than its header')
+    magic, version, pending, count, session = BATCH_HEADER.unpack_from(body)
+    if magic != BATCH_MAGIC or version != BATCH_VERSION:
+        raise ValueError(f'not a version {BATCH_VERSION} trial batch')
+    if len(body) != BATCH_HEADER.size + count * TRIAL_DTYPE.itemsize:
+        raise ValueError(f'batch size does not match its count of {count} trials')
+    try:
+        session = session.rstrip(b'\0').decode('ascii')
+    except UnicodeDecodeError as e:
+        raise ValueError('`session` must be ASCII') from e
+    return session, pending, numpy.frombuffer(body, dtype=TRIAL_DTYPE, count=count, offset=BATCH_HEADER.size)
+
+
+class TrialStore:
+    """
+    Durable store for trial data, one append-only file of `TRIAL_DTYPE`
+    records per session.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, session):
+        """
+        :param session: session id as sent by the client
+        :return: path of the session's trial file
+        """
+        if not (isinstance(session, str) and SESSION_PATTERN.fullmatch(session)):
+            raise ValueError("`session` must be 1-64 letters, digits, '-' or '_'")
+        return os.path.join(self.directory, f'{session}.trials')
+
+    def sessions(self):
+        """
+        :return: ids of all sessions that have stored trials
+        """
+        return sorted(
+            filename[:-len('.trials')]
+            for filename in os.listdir(self.directory)
+            if filename.endswith('.trials')
+        )
+
+    def append_records(self, session, records):
+        """
+        Append a batch of trials, as `TRIAL_DTYPE` records from
+        `decode_batch` or `trials_to_records`.
+
+        :param session: session id
+        :param records: array of `TRIAL_DTYPE` records
+        :return: number of trials stored
+        """
+        path = self.path(session)
+        with self.lock, open(path, 'ab') as f:
+            torn = f.tell() % TRIAL_DTYPE.itemsize
+            if torn:  # drop what an interrupted write left behind
+                f.truncate(f.tell() - torn)
+            f.write(records.tobytes())
+        return len(records)
+
+    def count(self, session):
+        """
+        :return: number of complete trials stored for `session`
+        """
+        try:
+            return os.path.getsize(self.path(session)) // TRIAL_DTYPE.itemsize
+        except FileNotFoundError:
+            return 0
+
+    def last(self, session):
+        """
+        :return: the session's most recent record, None if it has none
+        """
+        count = self.count(session)
+        if not count:
+            return None
+        with open(self.path(session), 'rb') as f:
+            f.seek((count - 1) * TRIAL_DTYPE.itemsize)
+            return numpy.frombuffer(f.read(TRIAL_DTYPE.itemsize), dtype=TRIAL_DTYPE)[0]
+
+    def read(self, session):
+        """
+        :return: read-only memory map of the session's records, an empty
+            array if there are none
+        """
+        count = self.count(session)
+        if not count:
+            return numpy.empty(0, dtype=TRIAL_DTYPE)
+        # a torn write at the end of the file is left out of the map
+        return numpy.memmap(self.path(session), dtype=TRIAL_DTYPE, mode='r', shape=(count,))